@@ -1,13 +1,13 @@
-import os
+import json
 from fastapi import FastAPI, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
-from openai import OpenAI
 
-OPENAI_KEY = os.getenv("OPENAI_API_KEY")
-client_chat = OpenAI(api_key=OPENAI_KEY)
-client_whisper = OpenAI(api_key=OPENAI_KEY)
-client_tts = OpenAI(api_key=OPENAI_KEY)
+from app.services.interview_service import InterviewService
+
+# One service, and therefore one pooled HTTP transport, for every endpoint
+service = InterviewService()
 
 app = FastAPI()
 
@@ -28,76 +28,38 @@ def root():
     return {"message": "Mock Interview API is running!"}
 
 @app.post("/generate_questions")
-def generate_questions_api(req: InterviewRequest):
-    prompt = [
-        {"role": "system", "content": "You are an expert interviewer."},
-        {"role": "user", "content": (
-            f"Generate {req.num_questions} {req.difficulty} level interview questions "
-            f"for the topic '{req.topic}'. Number them 1 to {req.num_questions}."
-        )}
-    ]
-    questions_text = chat_completion(prompt)
-    questions = []
-    for line in questions_text.split('\n'):
-        line = line.strip()
-        if line and (line[0].isdigit() or line.startswith('-')):
-            question = line.lstrip('0123456789.- )')
-            questions.append(question.strip())
-    if not questions:
-        questions = [questions_text]
-    return {"questions": questions[:req.num_questions]}
+async def generate_questions_api(req: InterviewRequest):
+    questions = await service.generate_questions(req.topic, req.difficulty, req.num_questions)
+    return {"questions": questions}
 
 @app.post("/transcribe_audio")
 async def transcribe_audio(file: UploadFile = File(...)):
-    with open("temp.wav", "wb") as buffer:
-        buffer.write(await file.read())
-    with open("temp.wav", "rb") as f:
-        transcript = client_whisper.audio.transcriptions.create(
-            model="whisper-1",
-            file=f
-        )
-    os.remove("temp.wav")
-    return {"transcript": transcript.text.strip()}
+    transcript = await service.whisper_transcribe(file.file, file.filename, file.content_type)
+    return {"transcript": transcript}
 
 @app.post("/tts")
-def tts(text: str = Form(...)):
-    import tempfile
-    import soundfile as sf
-    temp_out = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-    temp_out_path = temp_out.name
-    temp_out.close()
-    with client_tts.audio.speech.with_streaming_response.create(
-        model="gpt-4o-mini-tts",
-        voice="alloy",
-        input=text
-    ) as response:
-        response.stream_to_file(temp_out_path)
-    with open(temp_out_path, "rb") as f:
-        audio_bytes = f.read()
-    os.remove(temp_out_path)
+async def tts(text: str = Form(...)):
+    audio_bytes = await service.synthesize_speech(text, model="gpt-4o-mini-tts")
     return {"audio": audio_bytes.hex()}
 
 @app.post("/evaluate")
-def evaluate(req: EvaluationRequest):
-    eval_prompt = [
-        {"role": "system", "content": (
-            "You are a friendly and constructive interviewer. "
-            "For each question and answer pair, do the following:\n"
-            "- If the student gave no answer or 'No answer provided', politely say "
-            "'The question was not answered. Here is the correct answer:' and provide a medium-length correct answer.\n"
-            "- If the student's answer is incorrect or incomplete, politely say "
-            "'Your answer needs improvement. The correct answer is:' followed by the correct answer.\n"
-            "- If the answer is correct or good, give positive feedback.\n"
-            "Make the overall summary kind, helpful, and encouraging."
-        )},
-        {"role": "user", "content": str([qa.dict() for qa in req.qa_pairs])}
-    ]
-    feedback = chat_completion(eval_prompt)
+async def evaluate(req: EvaluationRequest):
+    feedback = await service.evaluate_answers([qa.dict() for qa in req.qa_pairs])
     return {"feedback": feedback}
 
-def chat_completion(messages, model="gpt-4o-mini"):
-    response = client_chat.chat.completions.create(
-        model=model,
-        messages=messages
-    )
-    return response.choices[0].message.content.strip()
\ No newline at end of file
+@app.post("/evaluate/stream")
+async def evaluate_stream(req: EvaluationRequest):
+    """Feedback as Server-Sent Events: token messages, then a 'done' event with the full text"""
+    async def events():
+        parts = []
+        try:
+            async for token in service.stream_evaluate_answers([qa.dict() for qa in req.qa_pairs]):
+                parts.append(token)
+                yield f"data: {json.dumps({'token': token})}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': f'Error streaming feedback: {e}'})}\n\n"
+            return
+        yield f"event: done\ndata: {json.dumps({'feedback': ''.join(parts).strip()})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
\ No newline at end of file
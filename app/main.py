@@ -1,10 +1,11 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+import asyncio
+import json
 import os
-from typing import List, Optional, Dict
-import tempfile
+from typing import BinaryIO, List, Optional, Dict
 import uuid
 from datetime import datetime
 from dotenv import load_dotenv
@@ -12,7 +13,12 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+from .services.audio_preprocessing import SpeechSegmenter, encode_wav
+from .services.hedging import DeadlineExceededError
 from .services.interview_service import InterviewService
+from .services.metrics import SESSIONS, MetricsMiddleware, render_metrics
+from .services.rate_limiter import UpstreamRateLimitError, upstream_session
+from .services.session_store import SessionConflictError, create_session_store
 
 app = FastAPI(
     title="Mock Interview Service API",
@@ -49,14 +55,70 @@ except Exception as e:
     print(f"❌ Unexpected error during service initialization: {e}")
     interview_service = None
 
-# In-memory session storage (use Redis/Database in production)
-interview_sessions: Dict[str, dict] = {}
+# Session storage backend is chosen by SESSION_STORE (memory, sqlite or redis)
+interview_sessions = create_session_store()
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
+
+# Whisper rejects files above 25 MB, so larger uploads are refused up front
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "25")) * 1024 * 1024)
+# Room for the multipart boundaries and form fields around the file itself
+MAX_BODY_BYTES = MAX_UPLOAD_BYTES + 64 * 1024
+
+class BodyLimitMiddleware:
+    """Refuse request bodies over MAX_BODY_BYTES with a 413.
+
+    A too-large Content-Length is rejected before any of the body is read;
+    otherwise the body is counted chunk by chunk as it is received.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    def _too_large(self, size: int) -> str:
+        return f"Request body too large ({size} bytes, limit {self.max_bytes} bytes)"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            response = JSONResponse({"detail": self._too_large(int(length))}, status_code=413,
+                                    headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised while the body is being parsed, so it becomes the response
+                    raise HTTPException(status_code=413, detail=self._too_large(received))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+app.add_middleware(BodyLimitMiddleware, max_bytes=MAX_BODY_BYTES)
+app.add_middleware(MetricsMiddleware)
+
+# Background grading tasks per session, keyed by question number
+evaluation_tasks: Dict[str, Dict[int, asyncio.Task]] = {}
 
 class InterviewSession(BaseModel):
     topic: str
     difficulty: str = "simple"
     num_questions: int = 2
 
+class BatchQuestionRequest(BaseModel):
+    requests: List[InterviewSession]
+    concurrency: Optional[int] = None
+
 class TextToSpeechRequest(BaseModel):
     text: str
 
@@ -67,6 +129,122 @@ class AnswerSubmission(BaseModel):
 class NextQuestionRequest(BaseModel):
     session_id: str
 
+async def _evaluate_in_background(answer_record: dict) -> Optional[str]:
+    try:
+        return await interview_service.evaluate_answer(
+            answer_record["question"],
+            answer_record["answer"],
+            answer_record.get("reference_answer")
+        )
+    except Exception as e:
+        # Left ungraded; finalize_evaluation retries it when the interview completes
+        print(f"❌ Background evaluation failed for question {answer_record['question_number']}: {e}")
+        return None
+
+def schedule_evaluation(session_id: str, answer_record: dict):
+    task = asyncio.create_task(_evaluate_in_background(answer_record))
+    evaluation_tasks.setdefault(session_id, {})[answer_record["question_number"]] = task
+
+async def await_background_evaluations(session_id: str, answers: List[dict]):
+    # Results stay on the worker that graded them; answers graded on another
+    # worker are simply graded again by finalize_evaluation
+    pending = evaluation_tasks.pop(session_id, {})
+    if pending:
+        results = dict(zip(pending.keys(), await asyncio.gather(*pending.values())))
+        for answer in answers:
+            if results.get(answer["question_number"]) and not answer.get("evaluation"):
+                answer["evaluation"] = results[answer["question_number"]]
+
+async def finish_evaluation(session_id: str, answers: List[dict]) -> str:
+    await await_background_evaluations(session_id, answers)
+    return await interview_service.finalize_evaluation(answers)
+
+async def sweep_expired_sessions():
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            purged = await interview_sessions.purge_expired()
+            if purged:
+                print(f"🧹 Purged {purged} expired sessions")
+            for session_id in list(evaluation_tasks):
+                if await interview_sessions.get(session_id) is None:
+                    for task in evaluation_tasks.pop(session_id).values():
+                        task.cancel()
+        except Exception as e:
+            print(f"❌ Error purging expired sessions: {e}")
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    app.state.session_sweeper = asyncio.create_task(sweep_expired_sessions())
+
+@app.on_event("startup")
+async def start_question_refill():
+    if interview_service and interview_service.question_refill:
+        interview_service.question_refill.start()
+
+@app.on_event("shutdown")
+async def stop_session_sweeper():
+    app.state.session_sweeper.cancel()
+    await interview_sessions.close()
+    if interview_service:
+        await interview_service.aclose()
+
+def upload_stream(audio_file: UploadFile) -> BinaryIO:
+    """Return the upload's spooled file, rewound, after enforcing the size cap"""
+    # Starlette already received the body in chunks under BodyLimitMiddleware's cap and
+    # spooled it (in memory up to 1 MB, then a temporary file), so the size is checked by
+    # position instead of reading it again
+    upload = audio_file.file
+    upload.seek(0, os.SEEK_END)
+    size = upload.tell()
+    upload.seek(0)
+    if size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Audio file too large ({size} bytes, limit {MAX_UPLOAD_BYTES} bytes)"
+        )
+    return upload
+
+def upstream_error(e: Exception, action: str) -> HTTPException:
+    """Map a failed upstream call to an HTTP error (429 for exhausted rate limits, 504 past a deadline)"""
+    if isinstance(e, UpstreamRateLimitError):
+        retry_after = max(1, round(e.retry_after or 1))
+        return HTTPException(
+            status_code=429,
+            detail=f"{action}: upstream is busy, retry in {retry_after}s",
+            headers={"Retry-After": str(retry_after)}
+        )
+    if isinstance(e, DeadlineExceededError):
+        return HTTPException(status_code=504, detail=f"{action}: {str(e)}")
+    return HTTPException(status_code=500, detail=f"{action}: {str(e)}")
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+async def stream_feedback_events(tokens, extra: dict, on_complete=None):
+    """Relay feedback tokens as SSE messages, then a final 'done' event with the full text"""
+    parts = []
+    try:
+        async for token in tokens:
+            parts.append(token)
+            yield sse_event({"token": token})
+    except Exception as e:
+        yield sse_event({"detail": f"Error streaming feedback: {str(e)}"}, event="error")
+        return
+    
+    feedback = "".join(parts).strip()
+    if on_complete:
+        await on_complete(feedback)
+    yield sse_event({**extra, "feedback": feedback}, event="done")
+
+def sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/")
 async def root():
     return {
@@ -86,6 +264,13 @@ async def health_check():
         "service": "Mock Interview API",
         "openai_configured": api_key_configured,
         "service_ready": service_ready,
+        "question_cache": interview_service.question_cache.stats() if service_ready else None,
+        "question_bank": await interview_service.question_bank_stats() if service_ready else None,
+        "tts_cache": interview_service.tts_cache.stats() if service_ready else None,
+        "audio_preprocessing": interview_service.audio_stats if service_ready else None,
+        "transport": interview_service.transport_stats() if service_ready else None,
+        "upstream": interview_service.scheduler_stats() if service_ready else None,
+        "single_flight": interview_service.single_flight.stats() if service_ready else None,
         "message": "Service ready" if service_ready else "OpenAI API key not configured or service initialization failed"
     }
 
@@ -95,7 +280,7 @@ async def generate_questions(request: InterviewSession):
         raise HTTPException(status_code=503, detail="Service not available. Check OPENAI_API_KEY configuration.")
     
     try:
-        questions = interview_service.generate_questions(
+        questions = await interview_service.generate_questions(
             request.topic, 
             request.difficulty, 
             request.num_questions
@@ -106,7 +291,32 @@ async def generate_questions(request: InterviewSession):
             "questions": questions
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating questions: {str(e)}")
+        raise upstream_error(e, "Error generating questions")
+
+@app.post("/generate-questions/batch")
+async def generate_questions_batch(request: BatchQuestionRequest):
+    """Generate questions for many candidates at once; failures are reported per item"""
+    if not interview_service:
+        raise HTTPException(status_code=503, detail="Service not available. Check OPENAI_API_KEY configuration.")
+    
+    results = await interview_service.generate_questions_many(
+        [(item.topic, item.difficulty, item.num_questions) for item in request.requests],
+        concurrency=request.concurrency
+    )
+    return {
+        "results": results,
+        "total": len(results),
+        "failed": sum(1 for r in results if "error" in r)
+    }
+
+@app.get("/question-bank/search")
+async def search_question_bank(q: str, topic: Optional[str] = None, difficulty: Optional[str] = None, limit: int = 20):
+    """Full-text search over every question stored in the question bank"""
+    if not interview_service or interview_service.question_bank is None:
+        raise HTTPException(status_code=404, detail="Question bank is not enabled. Set QUESTION_BANK_PATH.")
+    
+    results = await interview_service.question_bank.search(q, topic, difficulty, limit=max(1, min(limit, 100)))
+    return {"query": q, "results": results, "total": len(results)}
 
 @app.post("/transcribe-audio")
 async def transcribe_audio(audio_file: UploadFile = File(...)):
@@ -118,22 +328,21 @@ async def transcribe_audio(audio_file: UploadFile = File(...)):
         if not audio_file.filename.lower().endswith(('.wav', '.mp3', '.m4a', '.flac')):
             raise HTTPException(status_code=400, detail="Unsupported audio format")
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await audio_file.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
-        
-        # Transcribe
-        transcript = interview_service.whisper_transcribe(temp_path)
-        os.remove(temp_path)
+        # Transcribe straight from the upload buffer
+        transcript = await interview_service.whisper_transcribe(
+            upload_stream(audio_file),
+            audio_file.filename,
+            audio_file.content_type
+        )
         
         return {
             "transcript": transcript,
             "filename": audio_file.filename
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error transcribing audio: {str(e)}")
+        raise upstream_error(e, "Error transcribing audio")
 
 @app.post("/text-to-speech")
 async def text_to_speech(request: TextToSpeechRequest):
@@ -141,14 +350,34 @@ async def text_to_speech(request: TextToSpeechRequest):
         raise HTTPException(status_code=503, detail="Service not available. Check OPENAI_API_KEY configuration.")
     
     try:
-        audio_data = interview_service.generate_speech(request.text)
+        # Cache hits are served straight from disk without an upstream call
+        cached_path = interview_service.cached_speech_path(request.text)
+        if cached_path:
+            return FileResponse(
+                cached_path,
+                media_type="audio/mpeg",
+                filename="speech.mp3"
+            )
+        
+        # Pull the first chunk before responding so upstream errors still map to a 500
+        audio_stream = interview_service.shared_speech(request.text)
+        try:
+            first_chunk = await audio_stream.__anext__()
+        except StopAsyncIteration:
+            first_chunk = b""
+        
+        async def audio_chunks():
+            yield first_chunk
+            async for chunk in audio_stream:
+                yield chunk
+        
         return StreamingResponse(
-            audio_data,
+            audio_chunks(),
             media_type="audio/mpeg",
             headers={"Content-Disposition": "attachment; filename=speech.mp3"}
         )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating speech: {str(e)}")
+        raise upstream_error(e, "Error generating speech")
 
 @app.post("/evaluate-answers")
 async def evaluate_answers(answers: List[dict]):
@@ -156,13 +385,24 @@ async def evaluate_answers(answers: List[dict]):
         raise HTTPException(status_code=503, detail="Service not available. Check OPENAI_API_KEY configuration.")
     
     try:
-        feedback = interview_service.evaluate_answers(answers)
+        feedback = await interview_service.evaluate_answers(answers)
         return {
             "feedback": feedback,
             "evaluated_answers": len(answers)
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error evaluating answers: {str(e)}")
+        raise upstream_error(e, "Error evaluating answers")
+
+@app.post("/evaluate-answers/stream")
+async def evaluate_answers_stream(answers: List[dict]):
+    """Evaluate answers, streaming feedback tokens as Server-Sent Events"""
+    if not interview_service:
+        raise HTTPException(status_code=503, detail="Service not available. Check OPENAI_API_KEY configuration.")
+    
+    return sse_response(stream_feedback_events(
+        interview_service.stream_evaluate_answers(answers),
+        extra={"evaluated_answers": len(answers)}
+    ))
 
 @app.post("/start-interview")
 async def start_interview(request: InterviewSession):
@@ -173,25 +413,29 @@ async def start_interview(request: InterviewSession):
     try:
         # Generate session ID and questions
         session_id = str(uuid.uuid4())
-        questions = interview_service.generate_questions(
+        # Upstream calls made for this request queue fairly with other sessions
+        upstream_session.set(session_id)
+        question_set = await interview_service.generate_question_set(
             request.topic, 
             request.difficulty, 
             request.num_questions
         )
+        questions = [item["question"] for item in question_set]
         
-        # Create session
+        # Create session; reference answers are kept for grading and never sent to the client
         session_data = {
             "session_id": session_id,
             "topic": request.topic,
             "difficulty": request.difficulty,
             "questions": questions,
+            "reference_answers": [item["reference_answer"] for item in question_set],
             "current_question": 0,
             "answers": [],
             "started_at": datetime.now().isoformat(),
             "status": "active"
         }
         
-        interview_sessions[session_id] = session_data
+        await interview_sessions.save(session_id, session_data)
         
         # Greeting and first question
         greeting = f"Hello! Welcome to your {request.difficulty} level mock interview for {request.topic}."
@@ -206,47 +450,76 @@ async def start_interview(request: InterviewSession):
             "status": "waiting_for_answer"
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error starting interview: {str(e)}")
+        raise upstream_error(e, "Error starting interview")
 
 @app.post("/submit-answer")
-async def submit_answer(submission: AnswerSubmission):
-    """Submit an answer and get the next question"""
-    if submission.session_id not in interview_sessions:
+async def submit_answer(submission: AnswerSubmission, stream: bool = False):
+    """Submit an answer and get the next question (?stream=true streams final feedback as SSE)"""
+    session = await interview_sessions.get(submission.session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = interview_sessions[submission.session_id]
-    
     if session["status"] != "active":
         raise HTTPException(status_code=400, detail="Session is not active")
     
+    # Background grading tasks inherit this, so they queue under this session
+    upstream_session.set(submission.session_id)
+    
     try:
         # Store the answer
         current_q_index = session["current_question"]
         current_question = session["questions"][current_q_index]
         
-        session["answers"].append({
+        answer_record = {
             "question": current_question,
             "answer": submission.answer,
             "question_number": current_q_index + 1
-        })
+        }
+        reference_answers = session.get("reference_answers") or []
+        if current_q_index < len(reference_answers) and reference_answers[current_q_index]:
+            answer_record["reference_answer"] = reference_answers[current_q_index]
+        session["answers"].append(answer_record)
         
         # Move to next question
         session["current_question"] += 1
+        completed = session["current_question"] >= len(session["questions"])
+        if completed:
+            session["status"] = "completed"
+        # Fails if a concurrent submit already recorded this question
+        await interview_sessions.save(submission.session_id, session)
+        
+        # Grade this answer now so completion only has to summarize
+        if interview_service:
+            schedule_evaluation(submission.session_id, answer_record)
         
         # Check if interview is complete
-        if session["current_question"] >= len(session["questions"]):
-            session["status"] = "completed"
-            
-            # Generate feedback
-            feedback = interview_service.evaluate_answers(session["answers"])
-            
-            return {
+        if completed:
+            completion = {
                 "session_id": submission.session_id,
                 "message": "Interview completed!",
-                "feedback": feedback,
                 "total_answered": len(session["answers"]),
                 "status": "completed"
             }
+            
+            if stream:
+                await await_background_evaluations(submission.session_id, session["answers"])
+                
+                async def store_feedback(feedback: str):
+                    session["feedback"] = feedback
+                    await interview_sessions.save(submission.session_id, session)
+                
+                return sse_response(stream_feedback_events(
+                    interview_service.stream_finalize_evaluation(session["answers"]),
+                    extra=completion,
+                    on_complete=store_feedback
+                ))
+            
+            # Generate feedback from the per-answer results
+            feedback = await finish_evaluation(submission.session_id, session["answers"])
+            session["feedback"] = feedback
+            await interview_sessions.save(submission.session_id, session)
+            
+            return {**completion, "feedback": feedback}
         
         # Get next question
         next_question = session["questions"][session["current_question"]]
@@ -260,17 +533,18 @@ async def submit_answer(submission: AnswerSubmission):
             "status": "waiting_for_answer"
         }
         
+    except SessionConflictError:
+        raise HTTPException(status_code=409, detail="Answer already recorded by a concurrent request; reload the session")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing answer: {str(e)}")
+        raise upstream_error(e, "Error processing answer")
 
 @app.get("/session/{session_id}")
 async def get_session_status(session_id: str):
     """Get current session status"""
-    if session_id not in interview_sessions:
+    session = await interview_sessions.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = interview_sessions[session_id]
-    
     response = {
         "session_id": session_id,
         "topic": session["topic"],
@@ -284,6 +558,8 @@ async def get_session_status(session_id: str):
     if session["status"] == "active":
         if session["current_question"] < len(session["questions"]):
             response["current_question"] = session["questions"][session["current_question"]]
+    elif session.get("feedback"):
+        response["feedback"] = session["feedback"]
     
     return response
 
@@ -293,18 +569,18 @@ async def submit_audio_answer(session_id: str, audio_file: UploadFile = File(...
     if not interview_service:
         raise HTTPException(status_code=503, detail="Service not available.")
     
-    if session_id not in interview_sessions:
+    if await interview_sessions.get(session_id) is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    upstream_session.set(session_id)
+    
     try:
         # Transcribe audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await audio_file.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
-        
-        transcript = interview_service.whisper_transcribe(temp_path)
-        os.remove(temp_path)
+        transcript = await interview_service.whisper_transcribe(
+            upload_stream(audio_file),
+            audio_file.filename,
+            audio_file.content_type
+        )
         
         # Submit the transcribed answer
         submission = AnswerSubmission(session_id=session_id, answer=transcript)
@@ -313,14 +589,137 @@ async def submit_audio_answer(session_id: str, audio_file: UploadFile = File(...
         result["transcript"] = transcript
         return result
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise upstream_error(e, "Error processing audio")
+
+@app.websocket("/ws/interview/{session_id}")
+async def interview_websocket(websocket: WebSocket, session_id: str, sample_rate: int = 16000):
+    """Full-duplex interview: stream 16-bit mono PCM in, receive transcripts, questions and speech"""
+    await websocket.accept()
+    if not interview_service:
+        await websocket.close(code=1011, reason="Service not available.")
+        return
+    
+    session = await interview_sessions.get(session_id)
+    if session is None:
+        await websocket.close(code=4404, reason="Session not found")
+        return
+    if session["status"] != "active":
+        await websocket.close(code=4400, reason="Session is not active")
+        return
+    
+    send_lock = asyncio.Lock()
+    segmenter = SpeechSegmenter(sample_rate)
+    upstream_session.set(session_id)
+    segment_tasks: List[asyncio.Task] = []
+    speaking: Optional[asyncio.Task] = None
+    
+    async def send_json(data: dict):
+        async with send_lock:
+            await websocket.send_json(data)
+    
+    async def send_question(question: str, number: int, total: int):
+        await send_json({
+            "type": "question",
+            "question": question,
+            "question_number": number,
+            "total_questions": total
+        })
+        # Speech goes out as binary frames between audio_start and audio_end
+        await send_json({"type": "audio_start", "media_type": "audio/mpeg"})
+        async for chunk in interview_service.speech_chunks(f"Question {number}. {question}"):
+            async with send_lock:
+                await websocket.send_bytes(chunk)
+        await send_json({"type": "audio_end"})
+    
+    async def transcribe_segment(index: int, samples) -> str:
+        text = await interview_service.whisper_transcribe(
+            encode_wav(samples, sample_rate), f"segment-{index}.wav", "audio/wav"
+        )
+        await send_json({"type": "partial_transcript", "segment": index, "text": text})
+        return text
+    
+    def schedule_segments(segments):
+        for samples in segments:
+            if samples is not None:
+                segment_tasks.append(asyncio.create_task(transcribe_segment(len(segment_tasks), samples)))
+    
+    async def commit_answer() -> bool:
+        """Commit the transcribed answer; returns True once the interview is complete"""
+        nonlocal speaking
+        schedule_segments([segmenter.flush()])
+        texts = await asyncio.gather(*segment_tasks)
+        segment_tasks.clear()
+        segmenter.reset()
+        
+        transcript = " ".join(t for t in texts if t).strip()
+        try:
+            result = await submit_answer(AnswerSubmission(session_id=session_id, answer=transcript or "No answer provided."))
+        except HTTPException as e:
+            await send_json({"type": "error", "detail": e.detail})
+            return True
+        
+        await send_json({"type": "answer_committed", "transcript": transcript, **result})
+        if result["status"] == "completed":
+            return True
+        if speaking and not speaking.done():
+            speaking.cancel()
+        speaking = asyncio.create_task(send_question(
+            result["next_question"], result["question_number"], result["total_questions"]
+        ))
+        return False
+    
+    speaking = asyncio.create_task(send_question(
+        session["questions"][session["current_question"]],
+        session["current_question"] + 1,
+        len(session["questions"])
+    ))
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes"):
+                # Segments are transcribed concurrently while the candidate keeps talking
+                schedule_segments(segmenter.feed(message["bytes"]))
+                finished = segmenter.answer_ended and await commit_answer()
+            elif message.get("text") and json.loads(message["text"]).get("type") == "end_answer":
+                finished = await commit_answer()
+            else:
+                continue
+            
+            if finished:
+                await websocket.close()
+                break
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing audio: {str(e)}")
+        await send_json({"type": "error", "detail": f"Error processing audio stream: {str(e)}"})
+        await websocket.close(code=1011)
+    finally:
+        for task in [speaking, *segment_tasks]:
+            if task and not task.done():
+                task.cancel()
 
 @app.get("/sessions")
 async def list_sessions():
     """List all active sessions"""
+    counts = await interview_sessions.stats()
     return {
-        "active_sessions": len([s for s in interview_sessions.values() if s["status"] == "active"]),
-        "completed_sessions": len([s for s in interview_sessions.values() if s["status"] == "completed"]),
-        "total_sessions": len(interview_sessions)
+        "active_sessions": counts["active"],
+        "completed_sessions": counts["completed"],
+        "total_sessions": counts["total"],
+        "store": interview_sessions.backend
     }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics in the text exposition format"""
+    counts = await interview_sessions.stats()
+    for status in ("active", "completed"):
+        SESSIONS.set(counts[status], status=status)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,213 @@
+import io
+import os
+from typing import BinaryIO, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+TARGET_SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+# Frames quieter than this (relative to the loudest frame, or absolute) count as silence
+RELATIVE_THRESHOLD_DB = -40.0
+ABSOLUTE_THRESHOLD_DB = -55.0
+# Silence kept around the detected speech so word onsets and endings are not clipped
+PADDING_SECONDS = 0.25
+# Leading audio of a live stream used to measure the background noise level
+CALIBRATION_SECONDS = 0.3
+# Uploads are decoded this many seconds at a time, so the full-rate signal is never in memory
+BLOCK_SECONDS = 10.0
+# Longer uploads skip preprocessing; the 16 kHz mono result would otherwise grow with them
+MAX_PREPROCESS_SECONDS = float(os.getenv("AUDIO_PREPROCESS_MAX_SECONDS", "600"))
+FIR_TAPS = 63
+
+
+def _lowpass(samples: np.ndarray, cutoff: float, taps: int = FIR_TAPS) -> np.ndarray:
+    # Windowed-sinc FIR; cutoff is a fraction of the input sample rate
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    kernel /= kernel.sum()
+    return np.convolve(samples, kernel.astype(np.float32), mode="same")
+
+
+def resample(samples: np.ndarray, rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    if rate == target_rate or len(samples) == 0:
+        return samples
+    if target_rate < rate:
+        samples = _lowpass(samples, 0.5 * target_rate / rate)
+    duration = len(samples) / rate
+    target_times = np.arange(int(duration * target_rate)) / target_rate
+    return np.interp(target_times, np.arange(len(samples)) / rate, samples).astype(np.float32)
+
+
+def _resampled_blocks(audio: BinaryIO, rate: int, frames: int, target_rate: int = TARGET_SAMPLE_RATE):
+    """Decode, downmix and resample ``audio`` block by block, yielding target-rate mono chunks.
+
+    Blocks overlap by more than the filter length and each one only emits the target
+    samples that fall clear of its edges, so the output matches ``resample`` run on
+    the whole signal.
+    """
+    halo = FIR_TAPS
+    blocksize = max(int(rate * BLOCK_SECONDS), 4 * halo)
+    start = 0
+    emitted = 0
+    for block in sf.blocks(audio, blocksize=blocksize, overlap=2 * halo, dtype="float32", always_2d=True):
+        mono = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+        last = start + len(mono) >= frames
+        if target_rate < rate:
+            mono = _lowpass(mono, 0.5 * target_rate / rate)
+        if last:
+            count = int(frames / rate * target_rate) - emitted
+        else:
+            # Target samples whose source position falls before the block's trailing halo
+            count = int(np.ceil((start + len(mono) - halo) * target_rate / rate)) - emitted
+        if count > 0:
+            times = (emitted + np.arange(count)) * rate / target_rate
+            yield np.interp(times, start + np.arange(len(mono)), mono).astype(np.float32)
+            emitted += count
+        if last:
+            return
+        start += blocksize - 2 * halo
+
+
+def trim_silence(samples: np.ndarray, rate: int) -> np.ndarray:
+    frame = max(1, int(rate * FRAME_SECONDS))
+    num_frames = len(samples) // frame
+    if num_frames == 0:
+        return samples
+    frames = samples[:num_frames * frame].reshape(num_frames, frame)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-12)
+    threshold = max(energy_db.max() + RELATIVE_THRESHOLD_DB, ABSOLUTE_THRESHOLD_DB)
+    voiced = np.flatnonzero(energy_db > threshold)
+    if len(voiced) == 0:
+        return samples
+    padding = int(rate * PADDING_SECONDS)
+    start = max(0, voiced[0] * frame - padding)
+    end = min(len(samples), (voiced[-1] + 1) * frame + padding)
+    return samples[start:end]
+
+
+def encode_wav(samples: np.ndarray, rate: int) -> io.BytesIO:
+    encoded = io.BytesIO()
+    sf.write(encoded, samples, rate, format="WAV", subtype="PCM_16")
+    encoded.seek(0)
+    return encoded
+
+
+def preprocess_audio(audio: BinaryIO, filename: Optional[str] = None) -> Tuple[Optional[BinaryIO], dict]:
+    """Downmix, resample to 16 kHz, trim leading/trailing silence and re-encode as FLAC.
+
+    Returns ``(None, stats)`` when the input cannot be decoded (e.g. m4a), in which
+    case the original stream is rewound and should be sent unchanged.
+    """
+    start = audio.tell()
+    audio.seek(0, os.SEEK_END)
+    original_bytes = audio.tell() - start
+    audio.seek(start)
+    try:
+        # Only the header is read here, so oversized uploads are skipped before decoding
+        info = sf.info(audio)
+        audio.seek(start)
+        if info.duration > MAX_PREPROCESS_SECONDS:
+            return None, {"skipped": f"{filename or 'audio'}: {info.duration:.0f}s is over {MAX_PREPROCESS_SECONDS:.0f}s"}
+        mono = np.concatenate(list(_resampled_blocks(audio, info.samplerate, info.frames)) or [np.zeros(0, dtype=np.float32)])
+    except Exception as e:
+        audio.seek(start)
+        return None, {"skipped": f"{filename or 'audio'}: {e}"}
+
+    original_seconds = info.duration
+    mono = trim_silence(mono, TARGET_SAMPLE_RATE)
+
+    encoded = io.BytesIO()
+    sf.write(encoded, mono, TARGET_SAMPLE_RATE, format="FLAC", subtype="PCM_16")
+    encoded.seek(0)
+
+    processed_seconds = len(mono) / TARGET_SAMPLE_RATE
+    processed_bytes = encoded.getbuffer().nbytes
+    if processed_bytes >= original_bytes:
+        # Already compact (e.g. a short 16 kHz mono clip); send the original
+        audio.seek(start)
+        return None, {"skipped": "no reduction"}
+    return encoded, {
+        "original_bytes": original_bytes,
+        "processed_bytes": processed_bytes,
+        "bytes_saved": original_bytes - processed_bytes,
+        "original_seconds": round(original_seconds, 3),
+        "processed_seconds": round(processed_seconds, 3),
+        "seconds_saved": round(original_seconds - processed_seconds, 3),
+    }
+
+
+class SpeechSegmenter:
+    """Splits a live 16-bit mono PCM stream into speech segments on pauses.
+
+    ``feed`` returns finished segments (float32 arrays) and sets ``answer_ended``
+    once the speaker has been silent for ``end_silence`` seconds after speaking.
+    """
+
+    def __init__(self, sample_rate: int = TARGET_SAMPLE_RATE, segment_silence: float = 0.6,
+                 end_silence: float = 1.5, max_segment_seconds: float = 15.0,
+                 margin_db: float = 12.0, floor_db: float = -50.0):
+        self.sample_rate = sample_rate
+        self.frame_len = max(1, int(sample_rate * FRAME_SECONDS))
+        self.segment_silence = segment_silence
+        self.end_silence = end_silence
+        self.max_segment_samples = int(max_segment_seconds * sample_rate)
+        self.margin_db = margin_db
+        self.floor_db = floor_db
+        self.noise_db: Optional[float] = None
+        self._calibration_frames = int(CALIBRATION_SECONDS / FRAME_SECONDS)
+        self.answer_ended = False
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._segment = []
+        self._segment_samples = 0
+        self._silent_seconds = 0.0
+        self._heard_speech = False
+
+    def feed(self, pcm: bytes) -> list:
+        samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype=np.int16).astype(np.float32) / 32768.0
+        self._pending = np.concatenate([self._pending, samples])
+        num_frames = len(self._pending) // self.frame_len
+        if num_frames == 0:
+            return []
+        frames = self._pending[:num_frames * self.frame_len].reshape(num_frames, self.frame_len)
+        self._pending = self._pending[num_frames * self.frame_len:]
+        levels = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-12)
+
+        segments = []
+        for frame, level in zip(frames, levels):
+            if self._calibration_frames > 0:
+                self._calibration_frames -= 1
+                self.noise_db = level if self.noise_db is None else max(self.noise_db, level)
+                continue
+            if level > max(self.noise_db + self.margin_db, self.floor_db):
+                self._heard_speech = True
+                self._silent_seconds = 0.0
+                self._segment.append(frame)
+                self._segment_samples += len(frame)
+            else:
+                self.noise_db = 0.95 * self.noise_db + 0.05 * level
+                self._silent_seconds += FRAME_SECONDS
+                if self._segment:
+                    # Keep short pauses inside the segment so words are not cut apart
+                    self._segment.append(frame)
+                    self._segment_samples += len(frame)
+                if self._heard_speech and self._silent_seconds >= self.end_silence:
+                    self.answer_ended = True
+            if self._segment and (self._silent_seconds >= self.segment_silence
+                                  or self._segment_samples >= self.max_segment_samples):
+                segments.append(self.flush())
+        return segments
+
+    def flush(self) -> Optional[np.ndarray]:
+        if not self._segment:
+            return None
+        segment = np.concatenate(self._segment)
+        self._segment = []
+        self._segment_samples = 0
+        return segment
+
+    def reset(self):
+        self.flush()
+        self.answer_ended = False
+        self._heard_speech = False
+        self._silent_seconds = 0.0
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import time
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from .metrics import HEDGED_REQUESTS, HEDGE_WINS
+
+T = TypeVar("T")
+
+
+class DeadlineExceededError(Exception):
+    """Raised when no attempt (primary, hedge or fallback) answered before the call's deadline."""
+
+    def __init__(self, model: str, deadline: float):
+        super().__init__(f"No response from {model} within {deadline:g}s")
+        self.model = model
+        self.deadline = deadline
+
+
+class LatencyTracker:
+    """Rolling window of recent successful latencies per model and operation.
+
+    A capped grading reply and a full-interview evaluation on the same model take
+    very different times, so each operation keeps its own window.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def observe(self, model: str, operation: str, seconds: float):
+        self._samples[(model, operation)].append(seconds)
+
+    def percentile(self, model: str, operation: str, q: float) -> Optional[float]:
+        samples = self._samples.get((model, operation))
+        if not samples or len(samples) < self.min_samples:
+            return None
+        return float(np.percentile(samples, q))
+
+
+class Hedger:
+    """Runs an upstream call with a deadline, a hedged duplicate and a fallback model.
+
+    A duplicate of the call is sent once the first attempt has taken longer than
+    the model's recent ``hedge_percentile`` latency, and the first answer wins.
+    At most ``max_hedge_ratio`` of calls are hedged so average load stays flat.
+    When ``fallback_window`` seconds remain before the deadline, or every attempt
+    has failed, the call is also sent to ``fallback_model``. Operations listed in
+    ``deadlines`` use their own deadline instead of the default one.
+    """
+
+    def __init__(self, deadline: float = 45.0, deadlines: Optional[Dict[str, float]] = None,
+                 hedge_percentile: float = 95.0,
+                 hedge_initial_delay: float = 5.0, hedge_min_delay: float = 0.5,
+                 max_hedge_ratio: float = 0.1, fallback_model: Optional[str] = None,
+                 fallback_window: float = 10.0):
+        self.deadline = deadline
+        self.deadlines = dict(deadlines or {})
+        self.hedge_percentile = hedge_percentile
+        self.hedge_initial_delay = hedge_initial_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.max_hedge_ratio = max_hedge_ratio
+        self.fallback_model = fallback_model or None
+        self.fallback_window = fallback_window
+        self.latencies = LatencyTracker()
+        self.calls = 0
+        self.hedges = 0
+        self.fallbacks = 0
+        self.deadlines_exceeded = 0
+
+    @classmethod
+    def from_env(cls) -> "Hedger":
+        return cls(
+            deadline=float(os.getenv("OPENAI_CHAT_DEADLINE", "45")),
+            # One prompt grading a whole interview writes far more than any other call
+            deadlines={"evaluation": float(os.getenv("OPENAI_EVALUATION_DEADLINE", "120"))},
+            hedge_percentile=float(os.getenv("OPENAI_HEDGE_PERCENTILE", "95")),
+            hedge_initial_delay=float(os.getenv("OPENAI_HEDGE_INITIAL_DELAY", "5")),
+            max_hedge_ratio=float(os.getenv("OPENAI_HEDGE_MAX_RATIO", "0.1")),
+            fallback_model=os.getenv("OPENAI_FALLBACK_MODEL", "").strip(),
+            fallback_window=float(os.getenv("OPENAI_FALLBACK_WINDOW", "10"))
+        )
+
+    def hedge_delay(self, model: str, operation: str) -> Optional[float]:
+        if self.hedge_percentile <= 0 or self.hedges >= self.max_hedge_ratio * self.calls:
+            return None
+        observed = self.latencies.percentile(model, operation, self.hedge_percentile)
+        return max(self.hedge_min_delay, observed if observed is not None else self.hedge_initial_delay)
+
+    async def run(self, model: str, attempt: Callable[[str], Awaitable[T]], deadline: Optional[float] = None,
+                  operation: str = "chat") -> T:
+        deadline = deadline or self.deadlines.get(operation, self.deadline)
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        end = start + deadline
+        attempts: Dict[asyncio.Task, str] = {}
+
+        async def timed(target: str) -> T:
+            began = time.perf_counter()
+            result = await attempt(target)
+            self.latencies.observe(target, operation, time.perf_counter() - began)
+            return result
+
+        def launch(target: str, role: str):
+            attempts[asyncio.ensure_future(timed(target))] = role
+
+        delay = self.hedge_delay(model, operation)
+        hedge_at = start + delay if delay is not None else None
+        fallback = self.fallback_model if self.fallback_model != model else None
+        fallback_at = end - self.fallback_window if fallback else None
+        last_error: Optional[BaseException] = None
+        launch(model, "primary")
+
+        try:
+            while True:
+                now = loop.time()
+                if now >= end:
+                    self.deadlines_exceeded += 1
+                    raise DeadlineExceededError(model, deadline)
+                wake = min(t for t in (end, hedge_at, fallback_at) if t is not None)
+                done, _ = await asyncio.wait(attempts, timeout=max(0.0, wake - now),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    role = attempts.pop(task)
+                    if task.exception() is None:
+                        HEDGE_WINS.inc(model=model, winner=role)
+                        return task.result()
+                    last_error = task.exception()
+
+                now = loop.time()
+                if not attempts:
+                    # Everything sent so far failed; the fallback is the last resort
+                    if fallback_at is None:
+                        raise last_error
+                    fallback_at = now
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    if attempts:
+                        self.hedges += 1
+                        HEDGED_REQUESTS.inc(model=model, reason="hedge")
+                        launch(model, "hedge")
+                if fallback_at is not None and now >= fallback_at:
+                    fallback_at = None
+                    self.fallbacks += 1
+                    HEDGED_REQUESTS.inc(model=fallback, reason="fallback")
+                    launch(fallback, "fallback")
+        finally:
+            # Losing and timed-out attempts are abandoned
+            for task in attempts:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "fallbacks": self.fallbacks,
+            "deadlines_exceeded": self.deadlines_exceeded,
+            "fallback_model": self.fallback_model,
+            "deadlines": {"default": self.deadline, **self.deadlines},
+        }
@@ -1,10 +1,30 @@
 import os
-from openai import OpenAI
-import tempfile
+from openai import AsyncOpenAI
+import asyncio
+import hashlib
+import json
+import threading
 import io
-from typing import List
+import random
+import tempfile
+import time
+from typing import AsyncIterator, BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from .audio_preprocessing import preprocess_audio
+from .hedging import Hedger
+from .metrics import AUDIO_BYTES, UPSTREAM_TTFB, instrumented, record_usage
+from .prompts import answer_prompt, evaluation_prompt, question_set_prompt, shard_prompt, summary_prompt
+from .question_bank import QuestionBankRefiller, create_question_bank
+from .question_cache import QuestionCache, normalize_topic
+from .rate_limiter import UpstreamScheduler, estimate_tokens
+from .single_flight import SingleFlight
+from .transport import create_http_client, operation_timeouts, transport_stats
+from .tts_cache import TTSCache
 
 class InterviewService:
+    # Size of the audio chunks forwarded to clients while speech is still being synthesized
+    speech_chunk_size = 4096
+
     def __init__(self):
         self.openai_key = os.getenv("OPENAI_API_KEY")
         if not self.openai_key:
@@ -18,72 +38,542 @@ class InterviewService:
         
         try:
             print(f"🔧 Initializing OpenAI clients...")
-            self.client_chat = OpenAI(api_key=self.openai_key)
-            self.client_whisper = OpenAI(api_key=self.openai_key)
-            self.client_tts = OpenAI(api_key=self.openai_key)
+            # All clients share one pooled HTTP client so chat, transcription and
+            # speech calls reuse the same warm keep-alive connections
+            self.http_client = create_http_client()
+            self.timeouts = operation_timeouts()
+            # Retries are owned by the scheduler, which paces them against the rate limits
+            self.scheduler = UpstreamScheduler.from_env()
+            # Chat calls get a deadline, a hedged duplicate on slow answers and a fallback model
+            self.hedger = Hedger.from_env()
+            self.client_chat = AsyncOpenAI(api_key=self.openai_key, http_client=self.http_client, max_retries=0)
+            self.client_whisper = AsyncOpenAI(api_key=self.openai_key, http_client=self.http_client, max_retries=0)
+            self.client_tts = AsyncOpenAI(api_key=self.openai_key, http_client=self.http_client, max_retries=0)
             print("✅ OpenAI clients initialized successfully")
             
         except Exception as e:
             print(f"❌ Error initializing OpenAI clients: {e}")
             raise ValueError(f"Failed to initialize OpenAI clients: {e}")
 
-    def chat_completion(self, messages, model="gpt-4o-mini"):
-        response = self.client_chat.chat.completions.create(
-            model=model,
-            messages=messages
+        # Generated questions are cached per (topic, difficulty) as a pool larger
+        # than a single interview so repeat starts can be served without a round trip
+        self.question_pool_size = int(os.getenv("QUESTION_POOL_SIZE", "20"))
+        self.question_cache = QuestionCache(
+            max_size=int(os.getenv("QUESTION_CACHE_SIZE", "128")),
+            ttl_seconds=float(os.getenv("QUESTION_CACHE_TTL", "3600"))
         )
+        self.question_batch_concurrency = int(os.getenv("QUESTION_BATCH_CONCURRENCY", "8"))
+
+        # Optional persistent bank that interviews sample from locally; the refiller
+        # keeps pools that interviews keep asking for above their low watermark in the background
+        self.question_bank = create_question_bank()
+        self.question_refill = QuestionBankRefiller(
+            self.question_bank,
+            self._request_questions,
+            low_watermark=int(os.getenv("QUESTION_BANK_LOW_WATERMARK", "50")),
+            batch_size=self.question_pool_size,
+            interval=float(os.getenv("QUESTION_BANK_REFILL_INTERVAL", "300")),
+            min_demand=int(os.getenv("QUESTION_BANK_MIN_DEMAND", "3")),
+            max_pools=int(os.getenv("QUESTION_BANK_MAX_POOLS", "20")),
+            max_empty_batches=int(os.getenv("QUESTION_BANK_MAX_EMPTY_BATCHES", "3"))
+        ) if self.question_bank else None
+
+        # Synthesized speech is cached on local disk, keyed by (model, voice, text)
+        self.tts_cache = TTSCache(
+            os.getenv("TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mock_interview_tts_cache")),
+            max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "256")) * 1024 * 1024)
+        )
+
+        # Uploaded audio is downmixed, resampled and silence-trimmed before Whisper
+        self.audio_preprocessing = os.getenv("AUDIO_PREPROCESSING", "true").strip().lower() not in ("0", "false", "no")
+        self.audio_stats = {"files_processed": 0, "bytes_saved": 0, "seconds_saved": 0.0}
+
+        # Identical requests already in flight share one upstream call
+        self.single_flight = SingleFlight()
+
+        # Long interviews can be split into shards graded concurrently, so latency follows
+        # the slowest shard. It costs an extra summary call and the streamed feedback
+        # arrives a shard at a time, so it is opt-in and only used for longer interviews
+        self.evaluation_sharding = os.getenv("EVALUATION_SHARDING", "false").strip().lower() in ("1", "true", "yes")
+        self.evaluation_shard_min_answers = int(os.getenv("EVALUATION_SHARD_MIN_ANSWERS", "6"))
+        self.evaluation_shard_size = max(1, int(os.getenv("EVALUATION_SHARD_SIZE", "1")))
+        self.evaluation_concurrency = max(1, int(os.getenv("EVALUATION_CONCURRENCY", "8")))
+
+    def transport_stats(self) -> dict:
+        return transport_stats(self.http_client)
+
+    def scheduler_stats(self) -> dict:
+        return {**self.scheduler.stats(), "hedging": self.hedger.stats()}
+
+    async def question_bank_stats(self) -> Optional[dict]:
+        if self.question_bank is None:
+            return None
+        return {**await self.question_bank.stats(), "refill": self.question_refill.stats()}
+
+    async def aclose(self):
+        if self.question_refill is not None:
+            await self.question_refill.stop()
+            await self.question_bank.close()
+        await self.http_client.aclose()
+
+    @instrumented
+    async def chat_completion(self, messages, model="gpt-4o-mini", deadline: Optional[float] = None,
+                              response_format: Optional[dict] = None, max_tokens: Optional[int] = None,
+                              operation: str = "chat"):
+        options = {}
+        if response_format:
+            options["response_format"] = response_format
+        if max_tokens:
+            options["max_tokens"] = max_tokens
+        return await self.hedger.run(model, lambda target: self._chat_attempt(messages, target, options), deadline,
+                                     operation=operation)
+
+    async def _chat_attempt(self, messages, model: str, options: dict) -> str:
+        estimated = estimate_tokens(messages)
+        response = await self.scheduler.call(model, lambda: self.client_chat.chat.completions.create(
+            model=model,
+            messages=messages,
+            timeout=self.timeouts["chat"],
+            **options
+        ), tokens=estimated)
+        if response.usage:
+            self.scheduler.model(model).record_usage(estimated, response.usage.total_tokens)
+            record_usage(model, response.usage)
         return response.choices[0].message.content.strip()
 
-    def generate_questions(self, topic: str, difficulty: str, num_questions: int = 10) -> List[str]:
-        prompt = [
-            {"role": "system", "content": "You are an expert interviewer."},
-            {"role": "user", "content": (
-                f"Generate {num_questions} {difficulty} level interview questions "
-                f"for the topic '{topic}'. Number them 1 to {num_questions}."
-            )}
-        ]
-        questions_text = self.chat_completion(prompt)
+    async def stream_chat_completion(self, messages, model="gpt-4o-mini") -> AsyncIterator[str]:
+        # Only opening the stream is retried; tokens already yielded cannot be taken back
+        started = time.perf_counter()
+        stream = await self.scheduler.call(model, lambda: self.client_chat.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout=self.timeouts["chat"]
+        ), tokens=estimate_tokens(messages), operation="chat_stream")
+        first_token = True
+        async for chunk in stream:
+            if chunk.usage:
+                record_usage(model, chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                if first_token:
+                    UPSTREAM_TTFB.observe(time.perf_counter() - started, operation="chat_stream", model=model)
+                    first_token = False
+                yield chunk.choices[0].delta.content
+
+    @instrumented
+    async def generate_questions(self, topic: str, difficulty: str, num_questions: int = 10) -> List[str]:
+        return [item["question"] for item in await self.generate_question_set(topic, difficulty, num_questions)]
+
+    @instrumented
+    async def generate_question_set(self, topic: str, difficulty: str, num_questions: int = 10) -> List[dict]:
+        """Questions with their reference answers, as ``{"question", "reference_answer"}`` dicts."""
+        if self.question_bank is not None:
+            banked = await self.question_bank.sample(topic, difficulty, num_questions)
+            await self.question_refill.request(topic, difficulty)
+            if banked is not None:
+                return banked
+
+        cached = self.question_cache.get(topic, difficulty, num_questions)
+        if cached is not None:
+            return [dict(item) for item in cached]
+
+        pool_size = max(num_questions, self.question_pool_size)
+        key = ("questions", normalize_topic(topic), difficulty.strip().lower(), pool_size)
+        pool = await self.single_flight.do(key, lambda: self._request_pool(topic, difficulty, pool_size))
+        if len(pool) >= num_questions:
+            self.question_cache.put(topic, difficulty, pool)
+            return [dict(item) for item in random.sample(pool, num_questions)]
+        return [dict(item) for item in pool]
+
+    @instrumented
+    async def generate_questions_many(self, requests: List[Tuple[str, str, int]],
+                                      concurrency: Optional[int] = None) -> List[dict]:
+        # Identical requests are generated once; distinct ones run concurrently up to the limit
+        distinct = {}
+        for topic, difficulty, num_questions in requests:
+            key = (normalize_topic(topic), difficulty.strip().lower(), num_questions)
+            distinct.setdefault(key, (topic, difficulty, num_questions))
+
+        semaphore = asyncio.Semaphore(max(1, concurrency or self.question_batch_concurrency))
+
+        async def generate(topic: str, difficulty: str, num_questions: int) -> dict:
+            async with semaphore:
+                try:
+                    return {"questions": await self.generate_questions(topic, difficulty, num_questions)}
+                except Exception as e:
+                    return {"error": str(e)}
+
+        keys = list(distinct)
+        outcomes = dict(zip(keys, await asyncio.gather(*(generate(*distinct[k]) for k in keys))))
+
+        results = []
+        for topic, difficulty, num_questions in requests:
+            outcome = outcomes[(normalize_topic(topic), difficulty.strip().lower(), num_questions)]
+            result = {"topic": topic, "difficulty": difficulty}
+            if "error" in outcome:
+                result["error"] = outcome["error"]
+            else:
+                # Candidates sharing a request still get their own question order
+                result["questions"] = random.sample(outcome["questions"], len(outcome["questions"]))
+            results.append(result)
+        return results
+
+    async def _request_pool(self, topic: str, difficulty: str, num_questions: int) -> List[dict]:
+        pool = await self._request_questions(topic, difficulty, num_questions)
+        if self.question_bank is not None:
+            await self.question_bank.add(topic, difficulty, pool)
+        return pool
+
+    async def _request_questions(self, topic: str, difficulty: str, num_questions: int) -> List[dict]:
+        # One JSON-mode call returns the questions together with compact reference
+        # answers, so grading later only has to compare against them
+        questions_json = await self.chat_completion(
+            question_set_prompt(topic, difficulty, num_questions),
+            response_format={"type": "json_object"},
+            operation="question_set"
+        )
+        return self._parse_question_set(questions_json)[:num_questions]
+
+    @staticmethod
+    def _parse_question_set(questions_json: str) -> List[dict]:
+        try:
+            data = json.loads(questions_json)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Question generation returned invalid JSON: {e}")
+        entries = data.get("questions", []) if isinstance(data, dict) else data
         questions = []
-        for line in questions_text.split('\n'):
-            line = line.strip()
-            if line and (line[0].isdigit() or line.startswith('-')):
-                question = line.lstrip('0123456789.- )')
-                questions.append(question.strip())
+        for entry in entries if isinstance(entries, list) else []:
+            if isinstance(entry, str):
+                entry = {"question": entry}
+            if not isinstance(entry, dict) or not str(entry.get("question") or "").strip():
+                continue
+            questions.append({
+                "question": str(entry["question"]).strip(),
+                "reference_answer": str(entry.get("reference_answer") or "").strip() or None,
+            })
         if not questions:
-            questions = [questions_text]
-        return questions[:num_questions]
+            raise ValueError("Question generation returned no questions")
+        return questions
+
+    @instrumented
+    async def whisper_transcribe(self, audio: Union[str, BinaryIO], filename: Optional[str] = None,
+                                 content_type: Optional[str] = None, preprocess: Optional[bool] = None) -> str:
+        if isinstance(audio, str):
+            with open(audio, "rb") as f:
+                return await self.whisper_transcribe(f, filename or os.path.basename(audio), content_type, preprocess)
+
+        preprocess = self.audio_preprocessing if preprocess is None else preprocess
+        # Hashing a large upload takes a while, so it runs off the event loop
+        digest = await asyncio.get_running_loop().run_in_executor(None, self._audio_digest, audio)
+        key = ("transcription", digest, os.path.splitext(filename or "")[1].lower(), preprocess)
+        return await self.single_flight.do(
+            key, lambda: self._transcribe(audio, filename, content_type, preprocess)
+        )
+
+    @staticmethod
+    def _audio_digest(audio: BinaryIO) -> str:
+        start = audio.tell()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: audio.read(1024 * 1024), b""):
+            digest.update(chunk)
+        audio.seek(start)
+        return digest.hexdigest()
 
-    def whisper_transcribe(self, file_path: str) -> str:
-        with open(file_path, "rb") as f:
-            transcript = self.client_whisper.audio.transcriptions.create(
+    async def _transcribe(self, audio: BinaryIO, filename: Optional[str], content_type: Optional[str],
+                          preprocess: bool) -> str:
+        if preprocess:
+            processed, stats = await asyncio.get_running_loop().run_in_executor(
+                None, preprocess_audio, audio, filename
+            )
+            if processed is not None:
+                self.audio_stats["files_processed"] += 1
+                self.audio_stats["bytes_saved"] += stats["bytes_saved"]
+                self.audio_stats["seconds_saved"] += stats["seconds_saved"]
+                print(f"🎚️ Preprocessed audio: saved {stats['bytes_saved']} bytes and {stats['seconds_saved']}s")
+                audio = processed
+                filename = f"{os.path.splitext(filename or 'audio')[0]}.flac"
+                content_type = "audio/flac"
+
+        # File-like objects (in-memory or spooled uploads) are streamed as-is; the
+        # filename tells Whisper the real container format
+        upload = (filename or getattr(audio, "name", None) or "audio.wav", audio)
+        if content_type:
+            upload += (content_type,)
+        start = audio.tell()
+        audio.seek(0, os.SEEK_END)
+        AUDIO_BYTES.inc(audio.tell() - start, direction="in")
+
+        def transcribe():
+            # Rewind so a retried upload sends the whole file again
+            audio.seek(start)
+            return self.client_whisper.audio.transcriptions.create(
                 model="whisper-1",
-                file=f
+                file=upload,
+                timeout=self.timeouts["transcription"]
             )
+
+        transcript = await self.scheduler.call("whisper-1", transcribe, operation="transcription")
         return transcript.text.strip()
 
-    def generate_speech(self, text: str) -> io.BytesIO:
-        response = self.client_tts.audio.speech.create(
-            model="tts-1",
-            voice="alloy",
-            input=text
+    def cached_speech_path(self, text: str, model: str = "tts-1", voice: str = "alloy",
+                           response_format: str = "mp3") -> Optional[str]:
+        return self.tts_cache.get(model, voice, text, response_format)
+
+    async def stream_speech(self, text: str, model: str = "tts-1", voice: str = "alloy",
+                            response_format: str = "mp3") -> AsyncIterator[bytes]:
+        # Chunks are yielded as the upstream produces them and teed into the disk cache,
+        # so memory stays flat regardless of clip length
+        async def open_stream():
+            return await self.client_tts.audio.speech.with_streaming_response.create(
+                model=model,
+                voice=voice,
+                input=text,
+                response_format=response_format,
+                timeout=self.timeouts["speech"]
+            ).__aenter__()
+
+        writer = self.tts_cache.writer(model, voice, text, response_format)
+        try:
+            started = time.perf_counter()
+            response = await self.scheduler.call(model, open_stream, operation="speech")
+            first_chunk = True
+            try:
+                async for chunk in response.iter_bytes(self.speech_chunk_size):
+                    if first_chunk:
+                        UPSTREAM_TTFB.observe(time.perf_counter() - started, operation="speech", model=model)
+                        first_chunk = False
+                    AUDIO_BYTES.inc(len(chunk), direction="out")
+                    if writer:
+                        writer.write(chunk)
+                    yield chunk
+            finally:
+                await response.close()
+        except BaseException:
+            if writer:
+                writer.abort()
+            raise
+        if writer:
+            writer.commit()
+
+    def shared_speech(self, text: str, model: str = "tts-1", voice: str = "alloy",
+                      response_format: str = "mp3") -> AsyncIterator[bytes]:
+        # Concurrent requests for the same clip share one upstream stream
+        return self.single_flight.stream(
+            ("speech", self.tts_cache.make_key(model, voice, text, response_format)),
+            lambda: self.stream_speech(text, model=model, voice=voice, response_format=response_format)
         )
-        
-        audio_data = io.BytesIO(response.content)
+
+    async def speech_chunks(self, text: str, model: str = "tts-1", voice: str = "alloy",
+                            response_format: str = "mp3") -> AsyncIterator[bytes]:
+        cached_path = self.cached_speech_path(text, model=model, voice=voice, response_format=response_format)
+        if cached_path is None:
+            # Closed explicitly so an abandoned subscription never holds back the shared stream
+            subscription = self.shared_speech(text, model=model, voice=voice, response_format=response_format)
+            try:
+                async for chunk in subscription:
+                    yield chunk
+            finally:
+                await subscription.aclose()
+            return
+        with open(cached_path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.speech_chunk_size), b""):
+                yield chunk
+
+    @instrumented
+    async def synthesize_speech(self, text: str, model: str = "tts-1", voice: str = "alloy") -> bytes:
+        return b"".join([chunk async for chunk in self.speech_chunks(text, model=model, voice=voice)])
+
+    @instrumented
+    async def generate_speech(self, text: str, model: str = "tts-1", voice: str = "alloy") -> BinaryIO:
+        cached_path = self.cached_speech_path(text, model=model, voice=voice)
+        if cached_path is not None:
+            return open(cached_path, "rb")
+
+        audio_data = io.BytesIO(b"".join([chunk async for chunk in self.shared_speech(text, model=model, voice=voice)]))
         audio_data.seek(0)
         return audio_data
 
+    @instrumented
+    async def evaluate_answers(self, student_answers: List[dict]) -> str:
+        if not self._should_shard(student_answers):
+            return await self.chat_completion(evaluation_prompt(student_answers), operation="evaluation")
+        shards = self._shards(student_answers)
+        feedback = await self._gather_bounded([lambda s=s: self._grade_shard(s) for s in shards])
+        entries = self._shard_entries(shards, feedback)
+        summary = await self.summarize_evaluations(entries)
+        return f"{self._shard_sections(shards, feedback)}\n\nOverall: {summary}"
+
+    async def stream_evaluate_answers(self, student_answers: List[dict]) -> AsyncIterator[str]:
+        if not self._should_shard(student_answers):
+            async for token in self.stream_chat_completion(evaluation_prompt(student_answers)):
+                yield token
+            return
+        shards = self._shards(student_answers)
+        tasks = self._bounded([lambda s=s: self._grade_shard(s) for s in shards])
+        try:
+            # Shards run concurrently but are emitted in question order
+            feedback = []
+            for shard, task in zip(shards, tasks):
+                feedback.append(await task)
+                yield self._shard_sections([shard], feedback[-1:]) + "\n\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+        yield "Overall: "
+        async for token in self.stream_chat_completion(summary_prompt(self._shard_entries(shards, feedback))):
+            yield token
+
+    def _should_shard(self, answers: List[dict]) -> bool:
+        return (self.evaluation_sharding and len(answers) >= self.evaluation_shard_min_answers
+                and len(answers) > self.evaluation_shard_size)
+
+    def _shards(self, answers: List[dict]) -> List[List[dict]]:
+        numbered = [{**a, "question_number": a.get("question_number", i)} for i, a in enumerate(answers, 1)]
+        size = self.evaluation_shard_size
+        return [numbered[i:i + size] for i in range(0, len(numbered), size)]
+
+    def _bounded(self, factories) -> List[asyncio.Task]:
+        # At most evaluation_concurrency of these calls are in flight at once
+        semaphore = asyncio.Semaphore(self.evaluation_concurrency)
+
+        async def run(factory):
+            async with semaphore:
+                return await factory()
+
+        return [asyncio.ensure_future(run(factory)) for factory in factories]
+
+    async def _gather_bounded(self, factories) -> list:
+        # The first failure cancels the calls still queued or in flight
+        tasks = self._bounded(factories)
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _grade_shard(self, shard: List[dict]) -> str:
+        if len(shard) == 1:
+            answer = shard[0]
+            return await self.evaluate_answer(
+                answer.get("question", ""), answer.get("answer") or "", answer.get("reference_answer")
+            )
+        return await self.chat_completion(shard_prompt(shard), operation="shard")
+
+    def _shard_sections(self, shards: List[List[dict]], feedback: List[str]) -> str:
+        # Group feedback already carries its own Q labels
+        return "\n\n".join(
+            self._feedback_sections([{**shard[0], "evaluation": text}]) if len(shard) == 1 else text
+            for shard, text in zip(shards, feedback)
+        )
+
+    @staticmethod
+    def _shard_entries(shards: List[List[dict]], feedback: List[str]) -> List[dict]:
+        entries = []
+        for shard, text in zip(shards, feedback):
+            numbers = [a["question_number"] for a in shard]
+            entries.append({
+                "question_number": numbers[0] if len(shard) == 1 else f"{numbers[0]}-{numbers[-1]}",
+                "question": " / ".join(str(a.get("question", "")) for a in shard),
+                "evaluation": text,
+            })
+        return entries
+
+    @instrumented
+    async def evaluate_answer(self, question: str, answer: str, reference_answer: Optional[str] = None) -> str:
+        # With a known reference answer grading is a short comparison, so the reply is capped
+        return await self.chat_completion(
+            answer_prompt(question, answer, reference_answer),
+            max_tokens=200 if reference_answer else None,
+            operation="answer"
+        )
+
+    @instrumented
+    async def summarize_evaluations(self, evaluated_answers: List[dict]) -> str:
+        return await self.chat_completion(summary_prompt(evaluated_answers), operation="summary")
+
+    async def _grade_missing(self, answers: List[dict]):
+        # Answers normally arrive here already graded by background tasks; anything
+        # still missing (failed or never scheduled) is graded concurrently now
+        missing = [a for a in answers if not a.get("evaluation")]
+        if missing:
+            results = await self._gather_bounded([
+                lambda a=a: self.evaluate_answer(a["question"], a["answer"], a.get("reference_answer"))
+                for a in missing
+            ])
+            for answer, evaluation in zip(missing, results):
+                answer["evaluation"] = evaluation
+
+    def _feedback_sections(self, answers: List[dict]) -> str:
+        return "\n\n".join(
+            f"Question {a.get('question_number', i)}: {a['question']}\n{a['evaluation']}"
+            for i, a in enumerate(answers, 1)
+        )
+
+    @instrumented
+    async def finalize_evaluation(self, answers: List[dict]) -> str:
+        await self._grade_missing(answers)
+        summary = await self.summarize_evaluations(answers)
+        return f"{self._feedback_sections(answers)}\n\nOverall: {summary}"
+
+    async def stream_finalize_evaluation(self, answers: List[dict]) -> AsyncIterator[str]:
+        await self._grade_missing(answers)
+        # The per-answer feedback is already known, so it goes out at once
+        # and only the summary is streamed token by token
+        yield f"{self._feedback_sections(answers)}\n\nOverall: "
+        async for token in self.stream_chat_completion(summary_prompt(answers)):
+            yield token
+
+
+class SyncInterviewService:
+    """Blocking facade over InterviewService for scripts without an event loop (e.g. the CLI)."""
+
+    def __init__(self, service: InterviewService = None):
+        self.service = service or InterviewService()
+        # The async clients keep their connection pools bound to one loop, so every
+        # call is scheduled onto the same long-lived loop running in a daemon thread.
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def chat_completion(self, messages, model="gpt-4o-mini", deadline: Optional[float] = None, operation: str = "chat"):
+        return self._run(self.service.chat_completion(messages, model=model, deadline=deadline, operation=operation))
+
+    def generate_questions(self, topic: str, difficulty: str, num_questions: int = 10) -> List[str]:
+        return self._run(self.service.generate_questions(topic, difficulty, num_questions))
+
+    def generate_question_set(self, topic: str, difficulty: str, num_questions: int = 10) -> List[dict]:
+        return self._run(self.service.generate_question_set(topic, difficulty, num_questions))
+
+    def whisper_transcribe(self, audio: Union[str, BinaryIO], filename: Optional[str] = None,
+                           content_type: Optional[str] = None, preprocess: Optional[bool] = None) -> str:
+        return self._run(self.service.whisper_transcribe(audio, filename, content_type, preprocess))
+
+    def generate_speech(self, text: str, model: str = "tts-1", voice: str = "alloy") -> BinaryIO:
+        return self._run(self.service.generate_speech(text, model=model, voice=voice))
+
+    def stream_speech(self, text: str, model: str = "tts-1", voice: str = "alloy",
+                      response_format: str = "mp3") -> Iterator[bytes]:
+        # Pulls chunks one at a time from the background loop, so the caller can
+        # start consuming audio before synthesis has finished
+        chunks = self.service.speech_chunks(text, model=model, voice=voice, response_format=response_format)
+        try:
+            while True:
+                try:
+                    yield self._run(chunks.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._run(chunks.aclose())
+
     def evaluate_answers(self, student_answers: List[dict]) -> str:
-        eval_prompt = [
-            {"role": "system", "content": (
-                "You are a friendly and constructive interviewer. "
-                "For each question and answer pair, do the following:\n"
-                "- If the student gave no answer or 'No answer provided', politely say "
-                "'The question was not answered. Here is the correct answer:' and provide a medium-length correct answer.\n"
-                "- If the student's answer is incorrect or incomplete, politely say "
-                "'Your answer needs improvement. The correct answer is:' followed by the correct answer.\n"
-                "- If the answer is correct or good, give positive feedback.\n"
-                "Make the overall summary kind, helpful, and encouraging."
-            )},
-            {"role": "user", "content": str(student_answers)}
-        ]
-        return self.chat_completion(eval_prompt)
+        return self._run(self.service.evaluate_answers(student_answers))
+
+    def evaluate_answer(self, question: str, answer: str, reference_answer: Optional[str] = None) -> str:
+        return self._run(self.service.evaluate_answer(question, answer, reference_answer))
+
+    def finalize_evaluation(self, answers: List[dict]) -> str:
+        return self._run(self.service.finalize_evaluation(answers))
@@ -0,0 +1,217 @@
+import functools
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+from starlette.routing import Match
+
+# Latency buckets in seconds, spanning cache hits to slow whole-interview grading
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, object] = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            # Per-bucket counts, then sum and count
+            series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, series in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render_metrics() -> str:
+    """Every registered metric in the Prometheus text exposition format (0.0.4)."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Time until the response body finished", ("method", "route"))
+HTTP_TTFB = Histogram("http_time_to_first_byte_seconds", "Time until the first response body bytes were sent", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled", ("route",))
+
+SERVICE_LATENCY = Histogram("interview_service_call_duration_seconds", "InterviewService method latency", ("method", "outcome"))
+
+UPSTREAM_LATENCY = Histogram("upstream_request_duration_seconds",
+                             "OpenAI request latency per attempt (until headers for streamed calls)",
+                             ("operation", "model", "outcome"))
+UPSTREAM_TTFB = Histogram("upstream_time_to_first_byte_seconds",
+                          "Time from opening a streamed OpenAI call to its first token or audio chunk",
+                          ("operation", "model"))
+UPSTREAM_IN_FLIGHT = Gauge("upstream_requests_in_flight", "OpenAI requests currently awaiting a response", ("operation",))
+UPSTREAM_QUEUE_WAIT = Histogram("upstream_queue_wait_seconds", "Time spent waiting for rate-limit admission", ("model",))
+HEDGED_REQUESTS = Counter("upstream_hedged_requests_total", "Extra chat requests sent as hedges or fallbacks", ("model", "reason"))
+HEDGE_WINS = Counter("upstream_hedge_wins_total", "Which attempt answered hedged chat calls first", ("model", "winner"))
+
+LLM_TOKENS = Counter("llm_tokens_total", "Chat tokens reported by the API", ("model", "kind"))
+PROMPT_TOKENS = Counter("prompt_tokens_built_total", "Estimated tokens of prompts built locally", ("prompt",))
+PROMPT_TOKENS_SAVED = Counter("prompt_tokens_saved_total", "Tokens saved by compact serialization and truncation", ("prompt",))
+AUDIO_BYTES = Counter("audio_bytes_total", "Audio uploaded for transcription (in) and synthesized by TTS (out)", ("direction",))
+SESSIONS = Gauge("interview_sessions", "Sessions held by the session store", ("status",))
+
+
+def instrumented(fn):
+    """Record the latency of an async InterviewService method under its name."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await fn(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            SERVICE_LATENCY.observe(time.perf_counter() - start, method=fn.__name__, outcome=outcome)
+    return wrapper
+
+
+def record_usage(model: str, usage) -> None:
+    if usage is not None:
+        LLM_TOKENS.inc(usage.prompt_tokens, model=model, kind="prompt")
+        LLM_TOKENS.inc(usage.completion_tokens, model=model, kind="completion")
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, time to first byte and in-flight requests per route.
+
+    Routes are labelled by their path template (``/session/{session_id}``) so
+    session IDs do not create a new series per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route(scope) -> str:
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route(scope)
+        method = scope["method"]
+        start = time.perf_counter()
+        state = {"status": 500, "first_byte": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body" and state["first_byte"] is None:
+                state["first_byte"] = time.perf_counter()
+                HTTP_TTFB.observe(state["first_byte"] - start, method=method, route=route)
+            await send(message)
+
+        with HTTP_IN_FLIGHT.track(route=route):
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                HTTP_LATENCY.observe(time.perf_counter() - start, method=method, route=route)
+                HTTP_REQUESTS.inc(method=method, route=route, status=state["status"])
+
+
+@contextmanager
+def track_upstream(operation: str, model: str):
+    start = time.perf_counter()
+    outcome = "error"
+    with UPSTREAM_IN_FLIGHT.track(operation=operation):
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, operation=operation, model=model, outcome=outcome)
+
@@ -0,0 +1,182 @@
+"""Prompt building shared by the API service, api_main.py and the CLI.
+
+Every grading prompt shares one short system message of rules instead of restating
+them in each prompt; it is well under the 1024 tokens the provider needs before it
+caches a prefix, so the saving is in tokens sent, not cache hits. Q/A pairs are
+serialized as compact numbered lines instead of Python reprs, and answers are
+truncated to fit a token budget so long transcripts cannot blow up a prompt.
+"""
+import os
+from typing import List, Optional, Sequence, Tuple
+
+from .metrics import PROMPT_TOKENS, PROMPT_TOKENS_SAVED
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:
+    # tiktoken is optional (and needs its encoding files); fall back to ~4 characters per token
+    _encoding = None
+
+# Whole-prompt budget for multi-answer evaluation, and the cap for any single answer
+PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "6000"))
+ANSWER_MAX_TOKENS = int(os.getenv("ANSWER_MAX_TOKENS", "800"))
+
+TRUNCATION_MARKER = " [...] "
+
+GRADING_RULES = (
+    "You are a friendly and constructive interviewer grading a mock interview.\n"
+    "- If the student gave no answer or 'No answer provided', politely say "
+    "'The question was not answered. Here is the correct answer:' and provide a medium-length correct answer.\n"
+    "- If the student's answer is incorrect or incomplete, politely say "
+    "'Your answer needs improvement. The correct answer is:' followed by the correct answer.\n"
+    "- If the answer is correct or good, give positive feedback.\n"
+    "Q<n> is question n, A<n> the student's answer and R<n> a reference answer when one is given."
+)
+
+EVALUATE_ALL_TASK = "Give feedback for every pair, then a kind, helpful and encouraging overall summary."
+EVALUATE_ONE_TASK = "Reply with the feedback for this answer only."
+EVALUATE_GROUP_TASK = "Give feedback for every pair, each starting with its Q label. Do not add an overall summary."
+REFERENCE_TASK = (
+    "Compare the answer with the reference answer R and reply in at most three sentences; "
+    "when a correct answer is needed, use the reference answer."
+)
+SUMMARY_SYSTEM = (
+    "You are a friendly and constructive interviewer. You are given the feedback already "
+    "written for each answer of a mock interview. Write a short overall summary of two or "
+    "three sentences that is kind, helpful, and encouraging. Do not repeat the per-question feedback."
+)
+QUESTION_SET_SYSTEM = "You are an expert interviewer. Reply with JSON only."
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def count_message_tokens(messages: Sequence[dict]) -> int:
+    # Each chat message carries a few tokens of role/separator overhead
+    return sum(count_tokens(m.get("content") or "") + 4 for m in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep the start and end of ``text`` (two thirds / one third) within ``max_tokens``."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    keep = max(1, max_tokens - count_tokens(TRUNCATION_MARKER))
+    head, tail = (keep * 2) // 3, keep - (keep * 2) // 3
+    if _encoding is not None:
+        tokens = _encoding.encode(text)
+        return _encoding.decode(tokens[:head]) + TRUNCATION_MARKER + (_encoding.decode(tokens[-tail:]) if tail else "")
+    return text[:head * 4] + TRUNCATION_MARKER + (text[-tail * 4:] if tail else "")
+
+
+def _allocate(lengths: List[int], available: int) -> List[int]:
+    # Water-filling: short answers keep everything, long ones share what is left equally
+    allocation = list(lengths)
+    if sum(lengths) <= available:
+        return allocation
+    remaining = max(0, available)
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    for position, i in enumerate(order):
+        share = remaining // (len(order) - position)
+        allocation[i] = min(lengths[i], share)
+        remaining -= allocation[i]
+    return allocation
+
+
+def format_qa_pairs(pairs: Sequence[dict], budget: Optional[int] = None,
+                    answer_cap: int = ANSWER_MAX_TOKENS) -> Tuple[str, int]:
+    """Serialize Q/A pairs as numbered lines, truncating answers to fit ``budget`` tokens.
+
+    Returns the text and the number of answer tokens removed by truncation.
+    """
+    numbered = []
+    for i, pair in enumerate(pairs, 1):
+        number = pair.get("question_number", i)
+        answer = str(pair.get("answer") or "").strip() or "No answer provided."
+        numbered.append((number, str(pair.get("question", "")).strip(), answer, pair.get("reference_answer")))
+
+    answers = [truncate_to_tokens(answer, answer_cap) for _, _, answer, _ in numbered]
+    if budget is not None:
+        fixed = sum(count_tokens(f"Q{n}: {q}\nA{n}: \n") + count_tokens(f"R{n}: {r}\n" if r else "")
+                    for n, q, _, r in numbered)
+        lengths = [count_tokens(a) for a in answers]
+        answers = [truncate_to_tokens(a, limit) if limit < length else a
+                   for a, length, limit in zip(answers, lengths, _allocate(lengths, budget - fixed))]
+
+    lines = []
+    for (number, question, _, reference), answer in zip(numbered, answers):
+        lines.append(f"Q{number}: {question}")
+        if reference:
+            lines.append(f"R{number}: {reference}")
+        lines.append(f"A{number}: {answer}")
+    removed = sum(count_tokens(a) for _, _, a, _ in numbered) - sum(count_tokens(a) for a in answers)
+    return "\n".join(lines), removed
+
+
+def _compiled(name: str, messages: List[dict], baseline_tokens: int) -> List[dict]:
+    tokens = count_message_tokens(messages)
+    saved = max(0, baseline_tokens - tokens)
+    PROMPT_TOKENS.inc(tokens, prompt=name)
+    if saved:
+        PROMPT_TOKENS_SAVED.inc(saved, prompt=name)
+        print(f"🧮 {name} prompt: {tokens} tokens ({saved} saved)")
+    return messages
+
+
+def evaluation_prompt(pairs: Sequence[dict], budget: int = PROMPT_MAX_TOKENS) -> List[dict]:
+    """Feedback for every pair plus an overall summary, in one call."""
+    static = [{"role": "system", "content": GRADING_RULES}, {"role": "system", "content": EVALUATE_ALL_TASK}]
+    qa_text, _ = format_qa_pairs(pairs, budget=budget - count_message_tokens(static))
+    # Baseline: the Python repr of the answer dicts this prompt used to send
+    baseline = count_message_tokens(static) + count_tokens(str(list(pairs))) + 4
+    return _compiled("evaluation", static + [{"role": "user", "content": qa_text}], baseline)
+
+
+def shard_prompt(pairs: Sequence[dict], budget: int = PROMPT_MAX_TOKENS) -> List[dict]:
+    """Feedback for a small group of pairs, without a summary, for sharded evaluation."""
+    static = [{"role": "system", "content": GRADING_RULES}, {"role": "system", "content": EVALUATE_GROUP_TASK}]
+    qa_text, removed = format_qa_pairs(pairs, budget=budget - count_message_tokens(static))
+    messages = static + [{"role": "user", "content": qa_text}]
+    return _compiled("shard", messages, count_message_tokens(messages) + removed)
+
+
+def answer_prompt(question: str, answer: str, reference_answer: Optional[str] = None) -> List[dict]:
+    """Feedback for one answer; a short comparison when the reference answer is known."""
+    task = REFERENCE_TASK if reference_answer else EVALUATE_ONE_TASK
+    pair = {"question": question, "answer": answer, "reference_answer": reference_answer, "question_number": 1}
+    qa_text, removed = format_qa_pairs([pair])
+    messages = [
+        {"role": "system", "content": GRADING_RULES},
+        {"role": "system", "content": task},
+        {"role": "user", "content": qa_text},
+    ]
+    return _compiled("answer", messages, count_message_tokens(messages) + removed)
+
+
+def summary_prompt(evaluated: Sequence[dict]) -> List[dict]:
+    feedback = "\n\n".join(
+        f"Q{a.get('question_number', i)}: {a['question']}\nFeedback: {a['evaluation']}"
+        for i, a in enumerate(evaluated, 1)
+    )
+    messages = [{"role": "system", "content": SUMMARY_SYSTEM}, {"role": "user", "content": feedback}]
+    return _compiled("summary", messages, count_message_tokens(messages))
+
+
+def question_set_prompt(topic: str, difficulty: str, num_questions: int) -> List[dict]:
+    messages = [
+        {"role": "system", "content": QUESTION_SET_SYSTEM},
+        {"role": "user", "content": (
+            f"Generate {num_questions} {difficulty} level interview questions for the topic '{topic}'. "
+            "For each question give a compact reference answer of one or two sentences "
+            "listing the key points a good answer must cover. Respond as "
+            '{"questions": [{"question": "...", "reference_answer": "..."}]}.'
+        )},
+    ]
+    return _compiled("question_set", messages, count_message_tokens(messages))
@@ -0,0 +1,383 @@
+import asyncio
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .question_cache import QuestionCache
+from .rate_limiter import upstream_session
+
+# MinHash signatures: 64 permutations split into 16 LSH bands of 4 rows. Two questions
+# with Jaccard similarity 0.7 share at least one band with ~99% probability.
+NUM_PERMUTATIONS = 64
+BAND_ROWS = 4
+SHINGLE_SIZE = 5
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Character n-grams of the lower-cased words, which suit short texts like questions."""
+    normalized = " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def minhash(text: str) -> np.ndarray:
+    hashes = np.array([zlib.crc32(s.encode()) for s in shingles(text)], dtype=np.uint64)
+    # Hashes fit in 32 bits and coefficients in 31, so nothing overflows uint64
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray) -> List[int]:
+    keys = []
+    for band, start in enumerate(range(0, NUM_PERMUTATIONS, BAND_ROWS)):
+        digest = hashlib.blake2b(bytes([band]) + signature[start:start + BAND_ROWS].tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+
+class QuestionBank:
+    """Persistent, de-duplicated question pools per (topic, difficulty) in SQLite.
+
+    Each pool numbers its questions 0..size-1, so sampling is a handful of
+    primary-key lookups however large the bank grows. Near-duplicates of a
+    question already in the pool are dropped on insert using MinHash LSH bands,
+    and every question is indexed for full-text search when SQLite has FTS5.
+    Queries and MinHash signatures are computed in a worker thread, so the public
+    methods are coroutines that never block the event loop.
+    """
+
+    def __init__(self, path: str, duplicate_threshold: float = 0.7):
+        self.path = path
+        self.duplicate_threshold = duplicate_threshold
+        self.hits = 0
+        self.misses = 0
+        self.duplicates = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pools ("
+            "id INTEGER PRIMARY KEY, topic TEXT NOT NULL, difficulty TEXT NOT NULL, "
+            "size INTEGER NOT NULL DEFAULT 0, UNIQUE (topic, difficulty))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "id INTEGER PRIMARY KEY, pool_id INTEGER NOT NULL, seq INTEGER NOT NULL, "
+            "question TEXT NOT NULL, reference_answer TEXT, signature BLOB NOT NULL, "
+            "created_at REAL NOT NULL, UNIQUE (pool_id, seq))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS question_bands ("
+            "pool_id INTEGER NOT NULL, band_key INTEGER NOT NULL, question_id INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS question_bands_key ON question_bands (pool_id, band_key)")
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts "
+                "USING fts5(question, content='questions', content_rowid='id')"
+            )
+            self.fts = True
+        except sqlite3.OperationalError:
+            print("⚠️ SQLite was built without FTS5; question search falls back to LIKE")
+            self.fts = False
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _pool(self, topic: str, difficulty: str) -> Tuple[Optional[int], int]:
+        rows = self._conn.execute(
+            "SELECT id, size FROM pools WHERE topic = ? AND difficulty = ?", QuestionCache.make_key(topic, difficulty)
+        ).fetchall()
+        return rows[0] if rows else (None, 0)
+
+    def _size_sync(self, topic: str, difficulty: str) -> int:
+        with self._lock:
+            return self._pool(topic, difficulty)[1]
+
+    async def size(self, topic: str, difficulty: str) -> int:
+        return await asyncio.to_thread(self._size_sync, topic, difficulty)
+
+    async def pools(self) -> List[Tuple[str, str, int]]:
+        return await asyncio.to_thread(self._execute, "SELECT topic, difficulty, size FROM pools")
+
+    async def sample(self, topic: str, difficulty: str, num_questions: int) -> Optional[List[dict]]:
+        """``num_questions`` distinct random questions, or None when the pool is too small."""
+        return await asyncio.to_thread(self._sample_sync, topic, difficulty, num_questions)
+
+    def _sample_sync(self, topic: str, difficulty: str, num_questions: int) -> Optional[List[dict]]:
+        with self._lock:
+            pool_id, size = self._pool(topic, difficulty)
+            if pool_id is None or size < num_questions:
+                self.misses += 1
+                return None
+            picks = random.sample(range(size), num_questions)
+            rows = self._conn.execute(
+                f"SELECT seq, question, reference_answer FROM questions "
+                f"WHERE pool_id = ? AND seq IN ({','.join('?' * len(picks))})",
+                (pool_id, *picks)
+            ).fetchall()
+        self.hits += 1
+        by_seq = {seq: {"question": q, "reference_answer": r or ""} for seq, q, r in rows}
+        return [by_seq[seq] for seq in picks if seq in by_seq]
+
+    async def add(self, topic: str, difficulty: str, items: List[dict]) -> int:
+        """Store new questions in the pool, skipping near-duplicates; returns how many were added."""
+        return await asyncio.to_thread(self._add_sync, topic, difficulty, items)
+
+    def _add_sync(self, topic: str, difficulty: str, items: List[dict]) -> int:
+        prepared = []
+        for item in items:
+            question = str(item.get("question", "")).strip()
+            if question:
+                prepared.append((question, str(item.get("reference_answer") or "").strip(), minhash(question)))
+        if not prepared:
+            return 0
+
+        key = QuestionCache.make_key(topic, difficulty)
+        added = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("INSERT OR IGNORE INTO pools (topic, difficulty) VALUES (?, ?)", key)
+                pool_id, size = self._pool(*key)
+                for question, reference_answer, signature in prepared:
+                    keys = band_keys(signature)
+                    if self._is_duplicate(pool_id, signature, keys):
+                        self.duplicates += 1
+                        continue
+                    question_id = self._conn.execute(
+                        "INSERT INTO questions (pool_id, seq, question, reference_answer, signature, created_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (pool_id, size, question, reference_answer, signature.tobytes(), time.time())
+                    ).lastrowid
+                    self._conn.executemany(
+                        "INSERT INTO question_bands (pool_id, band_key, question_id) VALUES (?, ?, ?)",
+                        [(pool_id, k, question_id) for k in keys]
+                    )
+                    if self.fts:
+                        self._conn.execute("INSERT INTO questions_fts (rowid, question) VALUES (?, ?)",
+                                           (question_id, question))
+                    size += 1
+                    added += 1
+                self._conn.execute("UPDATE pools SET size = ? WHERE id = ?", (size, pool_id))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def _is_duplicate(self, pool_id: int, signature: np.ndarray, keys: List[int]) -> bool:
+        # Only questions sharing an LSH band are compared, so the cost does not grow with the pool
+        rows = self._conn.execute(
+            f"SELECT DISTINCT q.signature FROM question_bands b JOIN questions q ON q.id = b.question_id "
+            f"WHERE b.pool_id = ? AND b.band_key IN ({','.join('?' * len(keys))})",
+            (pool_id, *keys)
+        ).fetchall()
+        if not rows:
+            return False
+        # The share of equal signature slots estimates the Jaccard similarity
+        candidates = np.frombuffer(b"".join(row[0] for row in rows), dtype=np.uint32).reshape(len(rows), -1)
+        return bool(((candidates == signature).mean(axis=1) >= self.duplicate_threshold).any())
+
+    async def search(self, query: str, topic: Optional[str] = None, difficulty: Optional[str] = None,
+                     limit: int = 20) -> List[dict]:
+        words = re.findall(r"\w+", query)
+        if not words:
+            return []
+        filters, params = "", []
+        if topic:
+            filters += " AND p.topic = ?"
+            params.append(QuestionCache.make_key(topic, "")[0])
+        if difficulty:
+            filters += " AND p.difficulty = ?"
+            params.append(difficulty.strip().lower())
+        if self.fts:
+            # Quote every word so user input cannot be parsed as FTS5 query syntax
+            match = " ".join('"' + w.replace('"', '""') + '"' for w in words)
+            sql = ("SELECT q.question, q.reference_answer, p.topic, p.difficulty FROM questions_fts "
+                   "JOIN questions q ON q.id = questions_fts.rowid JOIN pools p ON p.id = q.pool_id "
+                   f"WHERE questions_fts MATCH ?{filters} ORDER BY rank LIMIT ?")
+            params = [match, *params, limit]
+        else:
+            sql = ("SELECT q.question, q.reference_answer, p.topic, p.difficulty FROM questions q "
+                   f"JOIN pools p ON p.id = q.pool_id WHERE q.question LIKE ?{filters} LIMIT ?")
+            params = [f"%{' '.join(words)}%", *params, limit]
+        return [
+            {"question": q, "reference_answer": r or "", "topic": t, "difficulty": d}
+            for q, r, t, d in await asyncio.to_thread(self._execute, sql, params)
+        ]
+
+    async def stats(self) -> dict:
+        rows = await asyncio.to_thread(self._execute, "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pools")
+        pools, questions = rows[0]
+        total = self.hits + self.misses
+        return {
+            "path": self.path,
+            "pools": pools,
+            "questions": questions,
+            "duplicates_skipped": self.duplicates,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "full_text_search": self.fts,
+        }
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close_sync)
+
+    def _close_sync(self):
+        with self._lock:
+            self._conn.close()
+
+
+class QuestionBankRefiller:
+    """Background task that tops up pools in demand while they are below ``low_watermark``.
+
+    Every interview counts as one request for its pool. Only pools requested at
+    least ``min_demand`` times are refilled, the ``max_pools`` most requested first,
+    and counts halve on every sweep (each ``interval`` seconds) so demand has to
+    be recent. A pool whose batch fails or adds nothing (the model only repeats
+    itself) waits twice as long after each such batch and is retired after
+    ``max_empty_batches`` in a row. One batch is generated at a time, so refills
+    never compete with interview traffic for more than a single upstream call.
+    """
+
+    def __init__(self, bank: QuestionBank, generate: Callable[[str, str, int], Awaitable[List[dict]]],
+                 low_watermark: int = 50, batch_size: int = 20, interval: float = 300.0,
+                 min_demand: int = 3, max_pools: int = 20, max_empty_batches: int = 3):
+        self.bank = bank
+        self.generate = generate
+        self.low_watermark = low_watermark
+        self.batch_size = batch_size
+        self.interval = interval
+        self.min_demand = max(1, min_demand)
+        self.max_pools = max(1, max_pools)
+        self.max_empty_batches = max(1, max_empty_batches)
+        self.batches = 0
+        self.added = 0
+        self.failures = 0
+        self._demand: Dict[Tuple[str, str], float] = {}
+        self._empty_batches: Dict[Tuple[str, str], int] = {}
+        self._retry_at: Dict[Tuple[str, str], float] = {}
+        self._retired: Set[Tuple[str, str]] = set()
+        self._pending: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def request(self, topic: str, difficulty: str):
+        """Count a request for the pool and queue a refill once demand repeats (no-op unless started)."""
+        if self._task is None:
+            return
+        key = QuestionCache.make_key(topic, difficulty)
+        self._demand[key] = self._demand.get(key, 0) + 1
+        if (key in self._pending or len(self._pending) >= self.max_pools or not self._eligible(key)
+                or await self.bank.size(*key) >= self.low_watermark):
+            return
+        self._pending[key] = None
+        self._wake.set()
+
+    def _eligible(self, key: Tuple[str, str]) -> bool:
+        return (self._demand.get(key, 0) >= self.min_demand and key not in self._retired
+                and self._retry_at.get(key, 0.0) <= time.monotonic())
+
+    async def _run(self):
+        # Refill calls queue behind interview traffic as their own session
+        upstream_session.set("question-bank")
+        while True:
+            for key in sorted(self._demand, key=self._demand.get, reverse=True):
+                if len(self._pending) >= self.max_pools:
+                    break
+                if self._eligible(key) and await self.bank.size(*key) < self.low_watermark:
+                    self._pending[key] = None
+            while self._pending:
+                topic, difficulty = next(iter(self._pending))
+                del self._pending[(topic, difficulty)]
+                await self._top_up(topic, difficulty)
+            self._decay()
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _decay(self):
+        self._demand = {key: count / 2 for key, count in self._demand.items() if count >= 1}
+
+    async def _top_up(self, topic: str, difficulty: str):
+        key = (topic, difficulty)
+        while await self.bank.size(topic, difficulty) < self.low_watermark:
+            try:
+                items = await self.generate(topic, difficulty, self.batch_size)
+                added = await self.bank.add(topic, difficulty, items)
+            except Exception as e:
+                self.failures += 1
+                print(f"⚠️ Question bank refill for {topic}/{difficulty} failed: {e}")
+                added = 0
+            else:
+                self.batches += 1
+                self.added += added
+            if not added:
+                self._back_off(key)
+                return
+            self._empty_batches.pop(key, None)
+            self._retry_at.pop(key, None)
+            print(f"🗃️ Question bank: +{added} {difficulty} questions for '{topic}'")
+
+    def _back_off(self, key: Tuple[str, str]):
+        empty = self._empty_batches.get(key, 0) + 1
+        self._empty_batches[key] = empty
+        if empty >= self.max_empty_batches:
+            # The model has run out of new questions for this pool
+            self._retired.add(key)
+            print(f"🗃️ Question bank: stopped refilling '{key[0]}' ({key[1]}) after {empty} empty batches")
+        else:
+            self._retry_at[key] = time.monotonic() + self.interval * 2 ** (empty - 1)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "low_watermark": self.low_watermark,
+            "pending": len(self._pending),
+            "pools_in_demand": sum(1 for count in self._demand.values() if count >= self.min_demand),
+            "backing_off": sum(1 for at in self._retry_at.values() if at > time.monotonic()),
+            "retired": len(self._retired),
+            "batches": self.batches,
+            "added": self.added,
+            "failures": self.failures,
+        }
+
+
+def create_question_bank() -> Optional[QuestionBank]:
+    path = os.getenv("QUESTION_BANK_PATH", "").strip()
+    if not path:
+        return None
+    return QuestionBank(path, duplicate_threshold=float(os.getenv("QUESTION_BANK_DUPLICATE_THRESHOLD", "0.7")))
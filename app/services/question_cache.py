@@ -0,0 +1,61 @@
+import random
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+class QuestionCache:
+    """Bounded LRU cache of generated question pools with a per-entry TTL."""
+
+    def __init__(self, max_size: int = 128, ttl_seconds: float = 3600.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(topic: str, difficulty: str) -> Tuple[str, str]:
+        return normalize_topic(topic), difficulty.strip().lower()
+
+    def get(self, topic: str, difficulty: str, num_questions: int) -> Optional[List[Any]]:
+        key = self.make_key(topic, difficulty)
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, pool = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+            elif len(pool) >= num_questions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                # Sample instead of slicing so repeat candidates get a different order
+                return random.sample(pool, num_questions)
+        self.misses += 1
+        return None
+
+    def put(self, topic: str, difficulty: str, pool: List[Any]) -> None:
+        if self.max_size <= 0 or not pool:
+            return
+        key = self.make_key(topic, difficulty)
+        self._entries[key] = (time.monotonic(), list(pool))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,221 @@
+import asyncio
+import contextvars
+import json
+import os
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import openai
+
+from .metrics import UPSTREAM_QUEUE_WAIT, track_upstream
+from .prompts import count_message_tokens
+
+T = TypeVar("T")
+
+# Requests are queued per session so one busy interview cannot starve the others
+upstream_session: contextvars.ContextVar = contextvars.ContextVar("upstream_session", default="anonymous")
+
+DEFAULT_LIMITS = {
+    "gpt-4o-mini": {"rpm": 500, "tpm": 200000},
+    "whisper-1": {"rpm": 50},
+    "tts-1": {"rpm": 50},
+    "gpt-4o-mini-tts": {"rpm": 50},
+    "default": {"rpm": 500},
+}
+
+
+class UpstreamRateLimitError(Exception):
+    """Raised when the provider keeps answering 429 after every retry."""
+
+    def __init__(self, model: str, retry_after: Optional[float]):
+        super().__init__(f"Upstream rate limit reached for {model}")
+        self.model = model
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount: float) -> float:
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        # Reconcile an estimate with actual usage (negative delta refunds tokens)
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class ModelScheduler:
+    """Admits calls for one model at its provider limits, round-robin across sessions."""
+
+    def __init__(self, rpm: float, tpm: Optional[float] = None):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.admitted = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    async def acquire(self, session: str, tokens: int = 0):
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(session, deque()).append((future, tokens))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        while self._queues:
+            session, queue = next(iter(self._queues.items()))
+            future, tokens = queue[0]
+            if future.cancelled():
+                queue.popleft()
+                if not queue:
+                    del self._queues[session]
+                continue
+
+            delay = self.requests.delay_for(1)
+            if self.tokens:
+                delay = max(delay, self.tokens.delay_for(tokens))
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            queue.popleft()
+            future.set_result(None)
+            self.admitted += 1
+            # Move the session to the back of the line
+            del self._queues[session]
+            if queue:
+                self._queues[session] = queue
+
+    def pause(self, seconds: float):
+        self.requests.pause(seconds)
+
+    def record_usage(self, estimated: int, actual: int):
+        if self.tokens:
+            self.tokens.adjust(actual - estimated)
+
+
+class UpstreamScheduler:
+    """Rate-limits upstream calls per model and retries 429/5xx/connection errors.
+
+    Retry-After (or retry-after-ms) from the provider is honoured; otherwise the
+    delay is exponential backoff with full jitter.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, dict]] = None, max_retries: int = 4,
+                 base_delay: float = 0.5, max_delay: float = 20.0):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._models: Dict[str, ModelScheduler] = {}
+        self.retries = 0
+        self.rate_limited = 0
+
+    @classmethod
+    def from_env(cls) -> "UpstreamScheduler":
+        return cls(
+            limits=json.loads(os.getenv("OPENAI_RATE_LIMITS", "{}")),
+            max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "4")),
+            base_delay=float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.getenv("OPENAI_RETRY_MAX_DELAY", "20"))
+        )
+
+    def model(self, name: str) -> ModelScheduler:
+        if name not in self._models:
+            limit = self.limits.get(name, self.limits["default"])
+            self._models[name] = ModelScheduler(limit["rpm"], limit.get("tpm"))
+        return self._models[name]
+
+    async def call(self, model: str, fn: Callable[[], Awaitable[T]], tokens: int = 0,
+                   operation: str = "chat") -> T:
+        scheduler = self.model(model)
+        for attempt in range(self.max_retries + 1):
+            queued_at = time.perf_counter()
+            await scheduler.acquire(upstream_session.get(), tokens)
+            UPSTREAM_QUEUE_WAIT.observe(time.perf_counter() - queued_at, model=model)
+            try:
+                with track_upstream(operation, model):
+                    return await fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                rate_limited = isinstance(e, openai.APIStatusError) and e.status_code == 429
+                if rate_limited:
+                    self.rate_limited += 1
+                if delay is None or attempt == self.max_retries:
+                    if rate_limited:
+                        raise UpstreamRateLimitError(model, delay) from e
+                    raise
+                if rate_limited:
+                    # Hold every queued call for this model, not just this one
+                    scheduler.pause(delay)
+                self.retries += 1
+                print(f"⏳ Retrying {model} in {delay:.2f}s after: {e}")
+                await asyncio.sleep(delay)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        if isinstance(error, openai.APIStatusError):
+            if error.status_code != 429 and error.status_code < 500:
+                return None
+            retry_after = self._retry_after(error.response.headers)
+            if retry_after is not None:
+                return retry_after + random.uniform(0, self.base_delay)
+        elif not isinstance(error, openai.APIConnectionError):
+            return None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(headers) -> Optional[float]:
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except ValueError:
+            pass
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "models": {
+                name: {"queued": s.queued, "admitted": s.admitted}
+                for name, s in self._models.items()
+            },
+        }
+
+
+def estimate_tokens(messages) -> int:
+    # Prompt size plus room for the reply
+    return count_message_tokens(messages) + 256
@@ -0,0 +1,332 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class SessionConflictError(Exception):
+    """Raised by ``save`` when the session was saved by someone else since it was read."""
+
+    def __init__(self, session_id: str):
+        super().__init__(f"Session {session_id} was modified concurrently")
+        self.session_id = session_id
+
+
+class SessionStore(ABC):
+    """Interface for interview session persistence.
+
+    Sessions are plain dicts. ``get`` always returns a copy, so callers must
+    ``save`` after changing a session. Every save refreshes the session's TTL.
+
+    Saves are optimistic: a session carries the ``version`` it was read at
+    (absent for a new one), ``save`` raises SessionConflictError if the stored
+    version differs, and otherwise stores and sets the next version on the dict.
+    """
+
+    backend = "base"
+
+    def __init__(self, ttl_seconds: float = 3600.0):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def save(self, session_id: str, session: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def purge_expired(self) -> int:
+        ...
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, int]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+    @staticmethod
+    def _count(statuses: List[str]) -> Dict[str, int]:
+        return {
+            "active": statuses.count("active"),
+            "completed": statuses.count("completed"),
+            "total": len(statuses),
+        }
+
+
+class SessionRecord:
+    __slots__ = (
+        "session_id", "topic", "difficulty", "questions", "current_question",
+        "answers", "started_at", "status", "feedback", "reference_answers", "version", "extra", "expires_at",
+    )
+
+    _fields = __slots__[:-2]
+
+    def __init__(self, session: dict, expires_at: float):
+        for field in self._fields:
+            setattr(self, field, session.get(field))
+        self.extra = {k: v for k, v in session.items() if k not in self._fields} or None
+        self.expires_at = expires_at
+
+    def to_dict(self) -> dict:
+        session = {field: getattr(self, field) for field in self._fields if getattr(self, field) is not None}
+        if self.extra:
+            session.update(self.extra)
+        # Deep enough copy that callers can mutate answers without touching the record
+        session["questions"] = list(self.questions or [])
+        session["answers"] = [dict(a) for a in self.answers or []]
+        return session
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process store with a size cap and TTL; only safe with a single worker."""
+
+    backend = "memory"
+
+    def __init__(self, ttl_seconds: float = 3600.0, max_sessions: int = 10000):
+        super().__init__(ttl_seconds)
+        self.max_sessions = max_sessions
+        self._records: "OrderedDict[str, SessionRecord]" = OrderedDict()
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        record = self._records.get(session_id)
+        if record is None:
+            return None
+        if record.expires_at < time.time():
+            del self._records[session_id]
+            return None
+        return record.to_dict()
+
+    async def save(self, session_id: str, session: dict) -> None:
+        existing = self._records.get(session_id)
+        stored_version = (existing.version or 0) if existing and existing.expires_at >= time.time() else 0
+        if stored_version != session.get("version", 0):
+            raise SessionConflictError(session_id)
+        session["version"] = stored_version + 1
+        self._records[session_id] = SessionRecord(session, time.time() + self.ttl_seconds)
+        self._records.move_to_end(session_id)
+        while len(self._records) > self.max_sessions:
+            self._records.popitem(last=False)
+
+    async def delete(self, session_id: str) -> None:
+        self._records.pop(session_id, None)
+
+    async def purge_expired(self) -> int:
+        now = time.time()
+        expired = [sid for sid, record in self._records.items() if record.expires_at < now]
+        for sid in expired:
+            del self._records[sid]
+        return len(expired)
+
+    async def stats(self) -> Dict[str, int]:
+        now = time.time()
+        return self._count([record.status for record in self._records.values() if record.expires_at >= now])
+
+
+class SQLiteSessionStore(SessionStore):
+    """Local-disk store in WAL mode, shared by every worker on the same host.
+
+    Queries run on a worker thread, so a write lock held by another process
+    (up to the busy timeout) never stalls the event loop.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str, ttl_seconds: float = 3600.0):
+        super().__init__(ttl_seconds)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, status TEXT NOT NULL, "
+            "data TEXT NOT NULL, expires_at REAL NOT NULL, version INTEGER NOT NULL DEFAULT 0)"
+        )
+        try:
+            # Databases created before sessions were versioned
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+
+    def _execute_sync(self, sql: str, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            return cursor.fetchall(), cursor.rowcount
+
+    async def _execute(self, sql: str, params=()):
+        rows, _ = await asyncio.to_thread(self._execute_sync, sql, params)
+        return rows
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        rows = await self._execute(
+            "SELECT data FROM sessions WHERE session_id = ? AND expires_at >= ?",
+            (session_id, time.time())
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    async def save(self, session_id: str, session: dict) -> None:
+        expected = session.get("version", 0)
+        data = json.dumps({**session, "version": expected + 1}, separators=(",", ":"))
+        _, saved = await asyncio.to_thread(
+            self._execute_sync,
+            "INSERT INTO sessions (session_id, status, data, expires_at, version) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET status = excluded.status, data = excluded.data, "
+            "expires_at = excluded.expires_at, version = excluded.version WHERE sessions.version = ?",
+            (session_id, session.get("status", ""), data, time.time() + self.ttl_seconds, expected + 1, expected)
+        )
+        if not saved:
+            raise SessionConflictError(session_id)
+        session["version"] = expected + 1
+
+    async def delete(self, session_id: str) -> None:
+        await self._execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    async def purge_expired(self) -> int:
+        _, purged = await asyncio.to_thread(
+            self._execute_sync, "DELETE FROM sessions WHERE expires_at < ?", (time.time(),)
+        )
+        return purged
+
+    async def stats(self) -> Dict[str, int]:
+        rows = await self._execute(
+            "SELECT status, COUNT(*) FROM sessions WHERE expires_at >= ? GROUP BY status",
+            (time.time(),)
+        )
+        counts = dict(rows)
+        return {
+            "active": counts.get("active", 0),
+            "completed": counts.get("completed", 0),
+            "total": sum(counts.values()),
+        }
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close_sync)
+
+    def _close_sync(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Compare-and-set of the session JSON plus its index entries, atomically on the server.
+# KEYS: session, all-index, per-status indexes; ARGV: data, expected version, TTL,
+# index key for the new status, expiry time, session ID
+_REDIS_SAVE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+local version = 0
+if current then version = tonumber(cjson.decode(current)['version']) or 0 end
+if version ~= tonumber(ARGV[2]) then return 0 end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('ZADD', KEYS[2], ARGV[5], ARGV[6])
+for i = 3, #KEYS do
+    if KEYS[i] == ARGV[4] then
+        redis.call('ZADD', KEYS[i], ARGV[5], ARGV[6])
+    else
+        redis.call('ZREM', KEYS[i], ARGV[6])
+    end
+end
+return 1
+"""
+
+
+class RedisSessionStore(SessionStore):
+    """Store for any Redis-protocol server; expiry is delegated to the server's key TTLs.
+
+    Session IDs are also indexed in sorted sets per status, scored by expiry time,
+    so counting sessions never has to fetch them.
+
+    ``client`` may be any redis.asyncio-compatible client (e.g. a local stand-in
+    for tests); by default one is created from ``url`` with the optional ``redis`` package.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str = "redis://localhost:6379/0", ttl_seconds: float = 3600.0,
+                 prefix: str = "mock-interview:session:", client=None):
+        super().__init__(ttl_seconds)
+        self.prefix = prefix
+        if client is None:
+            try:
+                import redis.asyncio as redis_asyncio
+            except ImportError:
+                raise ValueError("SESSION_STORE=redis requires the 'redis' package (pip install redis)")
+            client = redis_asyncio.from_url(url)
+        self._client = client
+        self._index_keys = {status: f"{prefix}index:{status}" for status in ("all", "active", "completed")}
+        self._save_script = client.register_script(_REDIS_SAVE_SCRIPT)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}"
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        data = await self._client.get(self._key(session_id))
+        return json.loads(data) if data else None
+
+    async def save(self, session_id: str, session: dict) -> None:
+        ttl = max(1, int(self.ttl_seconds))
+        expected = session.get("version", 0)
+        status = session.get("status", "")
+        status_key = self._index_keys[status] if status in ("active", "completed") else ""
+        saved = await self._save_script(
+            keys=[self._key(session_id), *self._index_keys.values()],
+            args=[json.dumps({**session, "version": expected + 1}, separators=(",", ":")), expected, ttl,
+                  status_key, time.time() + ttl, session_id]
+        )
+        if not saved:
+            raise SessionConflictError(session_id)
+        session["version"] = expected + 1
+
+    async def delete(self, session_id: str) -> None:
+        pipe = self._client.pipeline(transaction=True)
+        pipe.delete(self._key(session_id))
+        for index_key in self._index_keys.values():
+            pipe.zrem(index_key, session_id)
+        await pipe.execute()
+
+    async def purge_expired(self) -> int:
+        # The server expires the session keys itself; only the indexes need pruning
+        pipe = self._client.pipeline(transaction=True)
+        for index_key in self._index_keys.values():
+            pipe.zremrangebyscore(index_key, "-inf", time.time())
+        return (await pipe.execute())[0]
+
+    async def stats(self) -> Dict[str, int]:
+        now = time.time()
+        pipe = self._client.pipeline(transaction=False)
+        for index_key in self._index_keys.values():
+            pipe.zcount(index_key, now, "+inf")
+        total, active, completed = await pipe.execute()
+        return {"active": active, "completed": completed, "total": total}
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+def create_session_store(env_prefix: str = "SESSION_", db_path: str = "sessions.db",
+                         redis_prefix: str = "mock-interview:session:") -> SessionStore:
+    """Build the store named by ``{env_prefix}STORE``; other apps pass their own prefixes
+    so they can share a Redis server or directory without mixing sessions."""
+    backend = os.getenv(f"{env_prefix}STORE", "memory").strip().lower()
+    ttl_seconds = float(os.getenv(f"{env_prefix}TTL", "3600"))
+    if backend == "memory":
+        return MemorySessionStore(ttl_seconds, max_sessions=int(os.getenv(f"{env_prefix}MAX", "10000")))
+    if backend == "sqlite":
+        return SQLiteSessionStore(os.getenv(f"{env_prefix}DB_PATH", db_path), ttl_seconds)
+    if backend == "redis":
+        return RedisSessionStore(os.getenv("REDIS_URL", "redis://localhost:6379/0"), ttl_seconds,
+                                 prefix=redis_prefix)
+    raise ValueError(f"Unknown {env_prefix}STORE '{backend}' (expected memory, sqlite or redis)")
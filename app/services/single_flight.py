@@ -0,0 +1,171 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one upstream request.
+
+    Callers that arrive while a call with the same key is in flight await the
+    same result instead of starting their own. The shared call keeps running
+    if one caller is cancelled, so the others still get the result.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._streams: Dict[Hashable, "_Broadcast"] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finished(self._calls, key, t))
+            self.leaders += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stream(self, key: Hashable, factory: Callable[[], AsyncIterator[bytes]]) -> AsyncIterator[bytes]:
+        """Like ``do`` for chunked responses, while the shared stream is still near its start.
+
+        Subscribers share a window of at most ``_Broadcast.window`` chunks, so memory
+        stays bounded however long the stream is. Once the first chunks have left the
+        window, later callers start a stream of their own instead of joining.
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None or not broadcast.joinable:
+            broadcast = _Broadcast(factory)
+            task = asyncio.ensure_future(broadcast.pump(factory()))
+            self._streams[key] = broadcast
+            task.add_done_callback(lambda t: self._finished(self._streams, key, broadcast))
+            self.leaders += 1
+        else:
+            self.shared += 1
+        return broadcast.subscribe()
+
+    @staticmethod
+    def _finished(calls: dict, key: Hashable, entry):
+        if calls.get(key) is entry:
+            del calls[key]
+        if isinstance(entry, asyncio.Future) and not entry.cancelled():
+            # Mark the exception retrieved in case every caller went away
+            entry.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls) + len(self._streams),
+            "upstream_calls": self.leaders,
+            "coalesced_calls": self.shared,
+        }
+
+
+class _Broadcast:
+    """Fans one chunk stream out to several subscribers through a bounded window.
+
+    The pump waits while the slowest subscriber is a full window behind, so the
+    upstream is read no faster than clients consume it. A subscriber that stays
+    that far behind for ``stall_timeout`` seconds (or was abandoned without being
+    closed) is dropped so it cannot hold up the others. A subscriber that starts
+    after the first chunk was dropped falls back to its own stream.
+    """
+
+    # Chunks held at most; 16 x 4 KiB speech chunks is 64 KiB per shared stream
+    window = 16
+    stall_timeout = 10.0
+
+    def __init__(self, factory: Callable[[], AsyncIterator[bytes]]):
+        self.factory = factory
+        self.chunks: Deque[bytes] = deque()
+        # Absolute index of self.chunks[0]
+        self.base = 0
+        self.done = False
+        self.error: Optional[BaseException] = None
+        # Next absolute chunk index per active subscriber
+        self._positions: Dict[object, int] = {}
+        self._changed = asyncio.Condition()
+
+    @property
+    def joinable(self) -> bool:
+        return self.base == 0 and not self.done
+
+    @property
+    def head(self) -> int:
+        return self.base + len(self.chunks)
+
+    def _trim(self):
+        # Keep what the slowest subscriber still needs; with nobody reading, the last window
+        low = min(self._positions.values()) if self._positions else self.head - self.window
+        while self.base < low:
+            self.chunks.popleft()
+            self.base += 1
+
+    async def pump(self, source: AsyncIterator[bytes]):
+        try:
+            async for chunk in source:
+                async with self._changed:
+                    try:
+                        await asyncio.wait_for(self._changed.wait_for(
+                            lambda: not self._positions or self.head - min(self._positions.values()) < self.window
+                        ), self.stall_timeout)
+                    except asyncio.TimeoutError:
+                        self._drop_stalled()
+                    self.chunks.append(chunk)
+                    self._trim()
+                    self._changed.notify_all()
+        except asyncio.CancelledError:
+            self.error = RuntimeError("Shared stream was cancelled")
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            async with self._changed:
+                self._changed.notify_all()
+
+    def _drop_stalled(self):
+        for token, position in list(self._positions.items()):
+            if self.head - position >= self.window:
+                del self._positions[token]
+        self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        if self.base > 0:
+            # The start of the stream is gone; replaying it would need the whole clip
+            async for chunk in self.factory():
+                yield chunk
+            return
+
+        token = object()
+        self._positions[token] = 0
+        try:
+            while True:
+                async with self._changed:
+                    await self._changed.wait_for(
+                        lambda: token not in self._positions or self._positions[token] < self.head or self.done
+                    )
+                    if token not in self._positions:
+                        raise RuntimeError("Subscriber fell too far behind the shared stream")
+                    position = self._positions[token]
+                    pending = list(self.chunks)[position - self.base:]
+                for chunk in pending:
+                    yield chunk
+                    async with self._changed:
+                        if token not in self._positions:
+                            raise RuntimeError("Subscriber fell too far behind the shared stream")
+                        self._positions[token] += 1
+                        self._trim()
+                        self._changed.notify_all()
+                if self.done and self._positions[token] >= self.head:
+                    if self.error is not None:
+                        raise self.error
+                    return
+        finally:
+            self._positions.pop(token, None)
+            async with self._changed:
+                self._trim()
+                self._changed.notify_all()
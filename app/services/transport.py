@@ -0,0 +1,87 @@
+import importlib.util
+import os
+from typing import Dict
+
+import httpx
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """Connection-pooled transport that counts requests and newly opened connections."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = 0
+        self.in_flight = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+
+    async def _trace(self, event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+        elif event == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if "trace" not in request.extensions:
+            request.extensions = {**request.extensions, "trace": self._trace}
+        self.requests += 1
+        self.in_flight += 1
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, object]:
+        connections = self._pool.connections
+        return {
+            "connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+            "http2_connections": sum(1 for c in connections if "HTTP/2" in c.info()),
+            "in_flight_requests": self.in_flight,
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "tls_handshakes": self.tls_handshakes,
+            "connection_reuse_ratio": round(1 - self.connections_opened / self.requests, 3) if self.requests else 0.0,
+        }
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build the single pooled HTTP client shared by every OpenAI client."""
+    setting = os.getenv("OPENAI_HTTP2", "auto").strip().lower()
+    http2 = http2_available() if setting == "auto" else setting in ("1", "true", "yes")
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=_env_float("OPENAI_KEEPALIVE_EXPIRY", 30.0)
+    )
+    transport = PooledTransport(limits=limits, http2=http2, retries=1)
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=operation_timeouts()["default"],
+        follow_redirects=True
+    )
+
+
+def operation_timeouts() -> Dict[str, httpx.Timeout]:
+    connect = _env_float("OPENAI_CONNECT_TIMEOUT", 5.0)
+    return {
+        "default": httpx.Timeout(_env_float("OPENAI_TIMEOUT", 60.0), connect=connect),
+        "chat": httpx.Timeout(_env_float("OPENAI_CHAT_TIMEOUT", 60.0), connect=connect),
+        "transcription": httpx.Timeout(_env_float("OPENAI_TRANSCRIPTION_TIMEOUT", 120.0), connect=connect),
+        "speech": httpx.Timeout(_env_float("OPENAI_SPEECH_TIMEOUT", 60.0), connect=connect),
+    }
+
+
+def transport_stats(client: httpx.AsyncClient) -> Dict[str, object]:
+    transport = getattr(client, "_transport", None)
+    if isinstance(transport, PooledTransport):
+        return transport.stats()
+    return {}
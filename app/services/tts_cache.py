@@ -0,0 +1,145 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Optional
+
+
+class TTSCache:
+    """Content-addressed on-disk cache of synthesized speech with size-based LRU eviction."""
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            self._load_index()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(model: str, voice: str, text: str, response_format: str = "mp3") -> str:
+        # Keys double as file names: content hash plus the audio format as extension
+        digest = hashlib.sha256(f"{model}\0{voice}\0{response_format}\0{text}".encode("utf-8")).hexdigest()
+        return f"{digest}.{response_format}"
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load_index(self):
+        # Rebuild LRU order from mtimes so a restarted worker keeps its warm cache
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".part"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, name, st.st_size))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def get(self, model: str, voice: str, text: str, response_format: str = "mp3") -> Optional[str]:
+        if not self.enabled:
+            return None
+        key = self.make_key(model, voice, text, response_format)
+        path = self.path_for(key)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            # Evicted by another worker sharing the directory
+            self._forget(key)
+            self.misses += 1
+            return None
+        if key not in self._sizes:
+            self.total_bytes += st.st_size
+        self._sizes[key] = st.st_size
+        self._sizes.move_to_end(key)
+        os.utime(path)
+        self.hits += 1
+        return path
+
+    def put(self, model: str, voice: str, text: str, audio: bytes, response_format: str = "mp3") -> Optional[str]:
+        writer = self.writer(model, voice, text, response_format)
+        if writer is None:
+            return None
+        try:
+            writer.write(audio)
+        except Exception:
+            writer.abort()
+            raise
+        return writer.commit()
+
+    def writer(self, model: str, voice: str, text: str, response_format: str = "mp3") -> Optional["CacheWriter"]:
+        if not self.enabled:
+            return None
+        return CacheWriter(self, self.make_key(model, voice, text, response_format))
+
+    def _add(self, key: str, size: int):
+        self._forget(key)
+        self._sizes[key] = size
+        self.total_bytes += size
+        self._evict()
+
+    def _forget(self, key: str):
+        size = self._sizes.pop(key, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._sizes),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class CacheWriter:
+    """Incrementally writes one cache entry; the entry only becomes visible on commit."""
+
+    def __init__(self, cache: TTSCache, key: str):
+        self.cache = cache
+        self.key = key
+        self.size = 0
+        # Write to a temp file and rename so readers never see a partial entry
+        fd, self.tmp_path = tempfile.mkstemp(dir=cache.directory, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> Optional[str]:
+        self._file.close()
+        if self.size == 0 or self.size > self.cache.max_bytes:
+            os.remove(self.tmp_path)
+            return None
+        path = self.cache.path_for(self.key)
+        os.replace(self.tmp_path, path)
+        self.cache._add(self.key, self.size)
+        return path
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
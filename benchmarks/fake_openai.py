@@ -0,0 +1,181 @@
+"""Local stand-in for the OpenAI API used by the benchmark harness.
+
+Answers chat (plain, streamed and JSON mode), transcription and speech calls
+with log-normally distributed latencies and configurable error rates, so the
+service can be load-tested offline without an API key.
+
+    python -m benchmarks.fake_openai --port 8900 --chat-ms 600 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+# Bytes of MP3 per input character, roughly 64 kbps speech at 15 characters per second
+SPEECH_BYTES_PER_CHAR = 530
+SPEECH_CHUNK_BYTES = 4096
+
+
+class FakeConfig:
+    def __init__(self, chat_ms: float = 600, stream_token_ms: float = 15, transcription_ms: float = 400,
+                 speech_ms: float = 250, sigma: float = 0.5, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after_ms: int = 200, seed: int = None):
+        # Median latencies in milliseconds; sigma is the log-normal spread (0 = constant)
+        self.chat_ms = chat_ms
+        self.stream_token_ms = stream_token_ms
+        self.transcription_ms = transcription_ms
+        self.speech_ms = speech_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_ms = retry_after_ms
+        self.random = random.Random(seed)
+
+    def latency(self, median_ms: float) -> float:
+        if median_ms <= 0:
+            return 0.0
+        return median_ms / 1000 * self.random.lognormvariate(0, self.sigma)
+
+    def injected_error(self):
+        roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (fake)", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after-ms": str(self.retry_after_ms)}
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            return JSONResponse({"error": {"message": "Internal server error (fake)", "type": "server_error"}},
+                                status_code=500)
+        return None
+
+
+def _usage(prompt: str, completion: str) -> dict:
+    prompt_tokens = max(1, len(prompt) // 4)
+    completion_tokens = max(1, len(completion) // 4)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def _chat_reply(body: dict) -> str:
+    prompt = body["messages"][-1]["content"] or ""
+    requested = re.search(r"(\d+)\b.*question", prompt)
+    count = int(requested.group(1)) if requested else 5
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps({"questions": [
+            {"question": f"Benchmark question {i}: explain concept {i}?",
+             "reference_answer": f"Concept {i} is explained by its key property {i}."}
+            for i in range(1, count + 1)
+        ]})
+    if "Generate" in prompt:
+        return "\n".join(f"{i}. Benchmark question {i}: explain concept {i}?" for i in range(1, count + 1))
+    return ("Good attempt. Your answer covers the main idea; mention the key trade-offs "
+            "and give a concrete example to make it complete.")
+
+
+def create_app(config: FakeConfig) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request):
+        body = await request.json()
+        await asyncio.sleep(config.latency(config.chat_ms))
+        error = config.injected_error()
+        if error:
+            return error
+
+        reply = _chat_reply(body)
+        prompt = " ".join(m.get("content") or "" for m in body["messages"])
+        created = int(time.time())
+        if not body.get("stream"):
+            return {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": created, "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": _usage(prompt, reply),
+            }
+
+        async def events():
+            for token in re.findall(r"\S+\s*", reply):
+                chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created,
+                         "model": body["model"],
+                         "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(config.latency(config.stream_token_ms))
+            if (body.get("stream_options") or {}).get("include_usage"):
+                chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created,
+                         "model": body["model"], "choices": [], "usage": _usage(prompt, reply)}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(request: Request):
+        form = await request.form()
+        upload = form.get("file")
+        size = len(await upload.read()) if upload is not None else 0
+        # Longer uploads take longer to transcribe
+        await asyncio.sleep(config.latency(config.transcription_ms) * (1 + size / 1_000_000))
+        error = config.injected_error()
+        if error:
+            return error
+        return {"text": "This is a transcribed benchmark answer about the key trade-offs."}
+
+    @app.post("/v1/audio/speech")
+    async def speech(request: Request):
+        body = await request.json()
+        await asyncio.sleep(config.latency(config.speech_ms))
+        error = config.injected_error()
+        if error:
+            return error
+        size = max(SPEECH_CHUNK_BYTES, len(body.get("input", "")) * SPEECH_BYTES_PER_CHAR)
+        media_type = "audio/pcm" if body.get("response_format") == "pcm" else "audio/mpeg"
+
+        async def audio():
+            sent = 0
+            while sent < size:
+                chunk = min(SPEECH_CHUNK_BYTES, size - sent)
+                yield b"\0" * chunk
+                sent += chunk
+                await asyncio.sleep(0)
+
+        return StreamingResponse(audio(), media_type=media_type)
+
+    @app.get("/health")
+    async def health():
+        return Response("ok")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI server for offline load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--chat-ms", type=float, default=600, help="Median chat completion latency")
+    parser.add_argument("--stream-token-ms", type=float, default=15, help="Median delay between streamed tokens")
+    parser.add_argument("--transcription-ms", type=float, default=400, help="Median transcription latency")
+    parser.add_argument("--speech-ms", type=float, default=250, help="Median time to first speech byte")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Log-normal latency spread (0 = constant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls answered with a 429")
+    parser.add_argument("--retry-after-ms", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        chat_ms=args.chat_ms, stream_token_ms=args.stream_token_ms, transcription_ms=args.transcription_ms,
+        speech_ms=args.speech_ms, sigma=args.sigma, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after_ms=args.retry_after_ms, seed=args.seed
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
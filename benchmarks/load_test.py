@@ -0,0 +1,306 @@
+"""Drive complete interview sessions through app/main.py against the fake OpenAI server.
+
+Starts ``benchmarks.fake_openai`` in a subprocess, points the service at it and
+runs sessions at each concurrency level in-process over ASGI. Reports
+throughput, p50/p95/p99 latency per endpoint, event-loop lag and memory per
+session. Run from the repository root:
+
+    python -m benchmarks.load_test --concurrency 1,8,32 --sessions 64
+    python -m benchmarks.load_test --json results.json --max-p95-ms 5000   # CI gate
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous limits so the run measures the service, not the provider quotas
+BENCHMARK_RATE_LIMITS = {m: {"rpm": 1_000_000, "tpm": 1_000_000_000}
+                         for m in ("gpt-4o-mini", "whisper-1", "tts-1", "gpt-4o-mini-tts", "default")}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_server(port: int, fake_args: List[str]) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_openai", "--port", str(port), *fake_args],
+        cwd=ROOT
+    )
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Fake OpenAI server exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Fake OpenAI server did not start")
+
+
+def sample_answer_wav(seconds: float = 4.0, rate: int = 48000) -> bytes:
+    """A spoken-answer stand-in: half a second of near-silence around a voiced middle."""
+    from app.services.audio_preprocessing import encode_wav
+
+    t = np.arange(int(seconds * rate)) / rate
+    voiced = (t > 0.5) & (t < seconds - 0.5)
+    rng = np.random.default_rng(0)
+    samples = 0.001 * rng.standard_normal(len(t))
+    samples[voiced] += 0.3 * np.sin(2 * np.pi * 220 * t[voiced]) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t[voiced]))
+    return encode_wav(samples.astype(np.float32), rate).getvalue()
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            raise
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+        return response
+
+
+class LoopLagMonitor:
+    """Measures how late a 10 ms timer fires; lag means the loop was blocked."""
+
+    interval = 0.01
+
+    def __init__(self):
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+async def run_session(client: httpx.AsyncClient, recorder: Recorder, index: int, args, answer_wav: bytes) -> bool:
+    topic = f"Benchmark topic {index % args.topics}"
+    response = await recorder.request(client, "/start-interview", "POST", "/start-interview", json={
+        "topic": topic, "difficulty": args.difficulty, "num_questions": args.questions
+    })
+    if response.status_code != 200:
+        return False
+    session = response.json()
+    session_id = session["session_id"]
+    question = session["current_question"]
+
+    for _ in range(session["total_questions"]):
+        if args.speak:
+            response = await recorder.request(client, "/text-to-speech", "POST", "/text-to-speech",
+                                              json={"text": question})
+            if response.status_code != 200:
+                return False
+        if args.answers == "audio":
+            response = await recorder.request(
+                client, "/audio-answer/{session_id}", "POST", f"/audio-answer/{session_id}",
+                files={"audio_file": ("answer.wav", answer_wav, "audio/wav")}
+            )
+        else:
+            response = await recorder.request(client, "/submit-answer", "POST", "/submit-answer", json={
+                "session_id": session_id, "answer": "It trades memory for speed by caching results."
+            })
+        if response.status_code != 200:
+            return False
+        result = response.json()
+        if result["status"] == "completed":
+            return bool(result.get("feedback"))
+        question = result["next_question"]
+    return False
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, sessions: int, args, answer_wav: bytes) -> dict:
+    recorder = Recorder()
+    monitor = LoopLagMonitor()
+    next_index = iter(range(sessions))
+    outcomes = []
+
+    async def virtual_user():
+        for index in next_index:
+            try:
+                outcomes.append(await run_session(client, recorder, index, args, answer_wav))
+            except httpx.HTTPError:
+                outcomes.append(False)
+
+    monitor.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await monitor.stop()
+
+    requests = sum(len(v) for v in recorder.latencies.values())
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "failed_sessions": outcomes.count(False),
+        "seconds": round(elapsed, 3),
+        "sessions_per_second": round(sessions / elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 3),
+        "endpoints": {
+            endpoint: {
+                "requests": len(values),
+                "errors": recorder.errors[endpoint],
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+            }
+            for endpoint, values in sorted(recorder.latencies.items())
+        },
+        "loop_lag_ms": {
+            "p50": round(percentile(monitor.samples, 50) * 1000, 2),
+            "p99": round(percentile(monitor.samples, 99) * 1000, 2),
+            "max": round(max(monitor.samples, default=0.0) * 1000, 2),
+        },
+    }
+
+
+async def measure_memory(client: httpx.AsyncClient, sessions: int, concurrency: int, args, answer_wav: bytes) -> dict:
+    # Separate pass so tracemalloc overhead does not skew the latency figures
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    await run_level(client, concurrency, sessions, args, answer_wav)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "retained_bytes_per_session": (retained - baseline) // sessions,
+        "peak_bytes_per_concurrent_session": (peak - baseline) // concurrency,
+    }
+
+
+def print_report(levels: List[dict], memory: Optional[dict]):
+    for level in levels:
+        print(f"\n=== concurrency {level['concurrency']}: {level['sessions']} sessions in {level['seconds']}s "
+              f"({level['sessions_per_second']} sessions/s, {level['requests_per_second']} req/s, "
+              f"{level['failed_sessions']} failed)")
+        print(f"{'endpoint':<28}{'requests':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for endpoint, stats in level["endpoints"].items():
+            print(f"{endpoint:<28}{stats['requests']:>9}{stats['errors']:>8}"
+                  f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+        lag = level["loop_lag_ms"]
+        print(f"event-loop lag: p50 {lag['p50']} ms, p99 {lag['p99']} ms, max {lag['max']} ms")
+    if memory:
+        print(f"\n=== memory ({memory['sessions']} sessions at concurrency {memory['concurrency']})")
+        print(f"retained per session: {memory['retained_bytes_per_session'] / 1024:.1f} KiB, "
+              f"peak per concurrent session: {memory['peak_bytes_per_concurrent_session'] / 1024:.1f} KiB")
+
+
+def check_thresholds(levels: List[dict], max_p95_ms: Optional[float], max_failed: int) -> List[str]:
+    problems = []
+    for level in levels:
+        if level["failed_sessions"] > max_failed:
+            problems.append(f"concurrency {level['concurrency']}: {level['failed_sessions']} failed sessions")
+        for endpoint, stats in level["endpoints"].items():
+            if max_p95_ms is not None and stats["p95_ms"] > max_p95_ms:
+                problems.append(f"concurrency {level['concurrency']}: {endpoint} p95 {stats['p95_ms']} ms")
+    return problems
+
+
+async def benchmark(args) -> dict:
+    # Imported only now so the service picks up the benchmark environment
+    from app.main import app
+
+    answer_wav = sample_answer_wav()
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=300) as client:
+            levels = []
+            for concurrency in args.concurrency:
+                levels.append(await run_level(client, concurrency, args.sessions, args, answer_wav))
+            memory = None
+            if args.memory_sessions:
+                memory = await measure_memory(client, args.memory_sessions, max(args.concurrency), args, answer_wav)
+    finally:
+        await app.router.shutdown()
+    return {"levels": levels, "memory": memory}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the interview API against a fake OpenAI server")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrent sessions per level")
+    parser.add_argument("--sessions", type=int, default=32, help="Sessions per concurrency level")
+    parser.add_argument("--questions", type=int, default=3, help="Questions per session")
+    parser.add_argument("--difficulty", default="medium")
+    parser.add_argument("--topics", type=int, default=5, help="Distinct topics cycled across sessions")
+    parser.add_argument("--answers", choices=("audio", "text"), default="audio")
+    parser.add_argument("--no-speak", dest="speak", action="store_false", help="Skip /text-to-speech per question")
+    parser.add_argument("--memory-sessions", type=int, default=32, help="Sessions in the memory pass (0 skips it)")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="Exit non-zero if any endpoint p95 exceeds this")
+    parser.add_argument("--max-failed-sessions", type=int, default=0)
+    args, fake_args = parser.parse_known_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+
+    port = free_port()
+    server = start_fake_server(port, fake_args)
+    try:
+        os.environ["OPENAI_API_KEY"] = "sk-benchmark"
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+        os.environ.setdefault("OPENAI_RATE_LIMITS", json.dumps(BENCHMARK_RATE_LIMITS))
+        os.environ.setdefault("TTS_CACHE_DIR", tempfile.mkdtemp(prefix="benchmark_tts_"))
+        sys.path.insert(0, ROOT)
+        results = asyncio.run(benchmark(args))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print_report(results["levels"], results["memory"])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    problems = check_thresholds(results["levels"], args.max_p95_ms, args.max_failed_sessions)
+    for problem in problems:
+        print(f"❌ {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
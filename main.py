@@ -1,11 +1,10 @@
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
 import sounddevice as sd
 import numpy as np
 import soundfile as sf
-import tempfile
-import time
+import io
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables from .env file
 load_dotenv()
@@ -26,84 +25,118 @@ if not OPENAI_KEY:
 
 print("✅ OpenAI API key loaded successfully")
 
-client_chat = OpenAI(api_key=OPENAI_KEY)
-client_whisper = OpenAI(api_key=OPENAI_KEY)
-client_tts = OpenAI(api_key=OPENAI_KEY)
+from app.services.interview_service import SyncInterviewService
+
+service = SyncInterviewService()
 
-DURATION = 10
 FS = 16000
-LATENCY_SECONDS = 3
+TTS_SAMPLE_RATE = 24000    # Raw PCM from the speech API is 24 kHz, 16-bit mono
+MAX_RECORD_SECONDS = 60    # Hard cap on a single answer
+SILENCE_SECONDS = 1.2      # Stop this long after the speaker goes quiet
+NO_SPEECH_TIMEOUT = 10     # Give up if nothing is said for this long
+FRAME_SECONDS = 0.03
+CALIBRATION_SECONDS = 0.3  # Initial ambient noise measurement
+SPEECH_MARGIN_DB = 12      # Frames this far above the noise floor count as speech
+SPEECH_FLOOR_DB = -50
+
+# Look-ahead pipeline: speech synthesis, transcription and grading run here
+# while the candidate is listening or answering
+executor = ThreadPoolExecutor(max_workers=4)
 
 # ===============================
 # AUDIO HELPERS
 # ===============================
-def record_audio(duration=DURATION, fs=FS):
-    print(f"\n🎤 Recording for {duration} seconds... Speak now!")
-    audio = sd.rec(int(duration * fs), samplerate=fs, channels=1, dtype='float32')
-    sd.wait()
-    return np.squeeze(audio)
-
-def save_temp_wav(audio_data, fs):
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-    sf.write(temp_file.name, audio_data, fs, subtype='PCM_16')
-    return temp_file.name
-
-def whisper_transcribe(file_path):
-    with open(file_path, "rb") as f:
-        transcript = client_whisper.audio.transcriptions.create(
-            model="whisper-1",
-            file=f
-        )
-    return transcript.text.strip()
+def frame_level_db(frame):
+    return 10 * np.log10(np.mean(frame ** 2) + 1e-12)
+
+def record_audio(max_duration=MAX_RECORD_SECONDS, fs=FS):
+    print(f"\n🎤 Listening... Speak now! (stops after {SILENCE_SECONDS}s of silence)")
+    frame_len = int(fs * FRAME_SECONDS)
+    calibration_frames = max(1, int(CALIBRATION_SECONDS / FRAME_SECONDS))
+    frames = []
+    noise_db = None
+    heard_speech = False
+    silent_seconds = 0.0
+
+    with sd.InputStream(samplerate=fs, channels=1, dtype='float32', blocksize=frame_len) as stream:
+        for i in range(int(max_duration / FRAME_SECONDS)):
+            block, _ = stream.read(frame_len)
+            frame = np.squeeze(block).copy()
+            frames.append(frame)
+            level = frame_level_db(frame)
+
+            if i < calibration_frames:
+                noise_db = level if noise_db is None else max(noise_db, level)
+                continue
+
+            if level > max(noise_db + SPEECH_MARGIN_DB, SPEECH_FLOOR_DB):
+                heard_speech = True
+                silent_seconds = 0.0
+                continue
+
+            # Track slow changes in background noise between words
+            noise_db = 0.95 * noise_db + 0.05 * level
+            silent_seconds += FRAME_SECONDS
+            if heard_speech and silent_seconds >= SILENCE_SECONDS:
+                break
+            if not heard_speech and silent_seconds >= NO_SPEECH_TIMEOUT:
+                break
+
+    return np.concatenate(frames)
+
+def encode_wav(audio_data, fs):
+    buffer = io.BytesIO()
+    sf.write(buffer, audio_data, fs, format='WAV', subtype='PCM_16')
+    buffer.seek(0)
+    return buffer
+
+def whisper_transcribe(audio_file):
+    return service.whisper_transcribe(audio_file, "answer.wav")
+
+def transcribe_in_background(audio):
+    return executor.submit(lambda: whisper_transcribe(encode_wav(audio, FS)))
 
 # ===============================
 # TTS HELPER
 # ===============================
-def speak_text_tts(text):
-    temp_out = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-    temp_out_path = temp_out.name
-    temp_out.close()
-
-    with client_tts.audio.speech.with_streaming_response.create(
-        model="tts-1",  # Updated model name
-        voice="alloy",
-        input=text
-    ) as response:
-        response.stream_to_file(temp_out_path)
-
-    data, samplerate = sf.read(temp_out_path, dtype="float32")
-    sd.play(data, samplerate)
-    sd.wait()
-    os.remove(temp_out_path)
+def prefetch_speech(text):
+    return executor.submit(lambda: b"".join(service.stream_speech(text, response_format="pcm")))
+
+def speak_text_tts(text, prefetched=None):
+    chunks = None
+    if prefetched is not None:
+        try:
+            chunks = [prefetched.result()]
+        except Exception as e:
+            print(f"❌ Prefetched speech failed, streaming instead: {e}")
+    if chunks is None:
+        chunks = service.stream_speech(text, response_format="pcm")
+
+    # Raw PCM needs no decoding, so each chunk is played as soon as it arrives
+    leftover = b""
+    with sd.OutputStream(samplerate=TTS_SAMPLE_RATE, channels=1, dtype='int16') as stream:
+        for chunk in chunks:
+            chunk = leftover + chunk
+            usable = len(chunk) - len(chunk) % 2
+            leftover = chunk[usable:]
+            if usable:
+                stream.write(np.frombuffer(chunk[:usable], dtype=np.int16))
 
 # ===============================
 # CHAT HELPERS
 # ===============================
 def chat_completion(messages, model="gpt-4o-mini"):
-    response = client_chat.chat.completions.create(
-        model=model,
-        messages=messages
-    )
-    return response.choices[0].message.content.strip()
+    return service.chat_completion(messages, model=model)
 
 def generate_questions(topic, difficulty, num_questions=10):
-    prompt = [
-        {"role": "system", "content": "You are an expert interviewer."},
-        {"role": "user", "content": (
-            f"Generate {num_questions} {difficulty} level interview questions "
-            f"for the topic '{topic}'. Number them 1 to {num_questions}."
-        )}
-    ]
-    questions_text = chat_completion(prompt)
-    questions = []
-    for line in questions_text.split('\n'):
-        line = line.strip()
-        if line and (line[0].isdigit() or line.startswith('-')):
-            question = line.lstrip('0123456789.- )')
-            questions.append(question.strip())
-    if not questions:
-        questions = [questions_text]
-    return questions[:num_questions]
+    return service.generate_question_set(topic, difficulty, num_questions)
+
+def evaluate_answer(answer_record):
+    return service.evaluate_answer(
+        answer_record["question"],
+        answer_record["answer"],
+        answer_record.get("reference_answer")
+    )
 
 # ===============================
 # MAIN INTERVIEW FLOW
@@ -118,64 +151,82 @@ if __name__ == "__main__":
 
     full_session_log = ""
     student_answers = []
-    questions = generate_questions(topic, difficulty, num_questions)
+    evaluations = []
 
-    # Step 1: Greeting
+    # Questions are generated while the greeting is synthesized
     greeting = f"Hello! Welcome to your {difficulty} level mock interview for {topic}. Let's begin."
+    greeting_audio = prefetch_speech(greeting)
+    question_set = generate_questions(topic, difficulty, num_questions)
+    questions = [item["question"] for item in question_set]
+    ack_msg = f"Great! I will now ask you {num_questions} questions, one by one."
+    ack_audio = prefetch_speech(ack_msg)
+    prompts = [f"Question {i}. {question}" for i, question in enumerate(questions, 1)]
+
+    # Step 1: Greeting
     print("AI:", greeting)
-    speak_text_tts(greeting)
+    speak_text_tts(greeting, greeting_audio)
     full_session_log += f"AI Greeting: {greeting}\n"
 
     # Step 2: Student greeting
     print("\nPlease greet back:")
-    audio = record_audio()
-    wav_path = save_temp_wav(audio, FS)
-    student_greeting = whisper_transcribe(wav_path)
-    os.remove(wav_path)
-    print("Student:", student_greeting)
-    full_session_log += f"Student Greeting: {student_greeting}\n"
+    greeting_transcript = transcribe_in_background(record_audio())
+    next_audio = prefetch_speech(prompts[0]) if prompts else None
 
-    # Step 3: Acknowledge
-    ack_msg = f"Great! I will now ask you {num_questions} questions, one by one."
+    # Step 3: Acknowledge (spoken while the greeting is transcribed)
     print("AI:", ack_msg)
-    speak_text_tts(ack_msg)
+    speak_text_tts(ack_msg, ack_audio)
+    student_greeting = greeting_transcript.result()
+    print("Student:", student_greeting)
+    full_session_log += f"Student Greeting: {student_greeting}\n"
     full_session_log += f"AI Acknowledgement: {ack_msg}\n"
 
     # Step 4: Interview Rounds
+    def record_answer(i, question, transcript):
+        student_answer = transcript.result()
+
+        # Handle empty or very short answer
+        if not student_answer or len(student_answer.strip()) < 3:
+            student_answer = "No answer provided."
+
+        print(f"Student (Q{i}):", student_answer)
+        answer_record = {
+            "question": question,
+            "answer": student_answer,
+            "question_number": i,
+            "reference_answer": question_set[i - 1]["reference_answer"]
+        }
+        student_answers.append(answer_record)
+        # Grade right away so only the short summary is left at the end
+        evaluations.append(executor.submit(evaluate_answer, answer_record))
+        return f"Q{i}: {question}\nA: {student_answer}\n"
+
+    pending_answer = None
     for i, question in enumerate(questions, 1):
+        # Synthesize the next question while this one is played and answered
+        question_audio = next_audio
+        next_audio = prefetch_speech(prompts[i]) if i < len(prompts) else None
+
         print(f"\n--- Round {i} ---")
         print(f"Question {i}: {question}")
-        speak_text_tts(f"Question {i}. {question}")
-        time.sleep(LATENCY_SECONDS)
+        speak_text_tts(prompts[i - 1], question_audio)
 
-        audio = record_audio()
-        wav_path = save_temp_wav(audio, FS)
-        student_answer = whisper_transcribe(wav_path)
-        os.remove(wav_path)
+        # The previous answer has been transcribing while this question played
+        if pending_answer:
+            full_session_log += record_answer(*pending_answer)
 
-        # Handle empty or very short answer
-        if not student_answer or len(student_answer.strip()) < 3:
-            student_answer = "No answer provided."
+        pending_answer = (i, question, transcribe_in_background(record_audio()))
 
-        print("Student:", student_answer)
-        student_answers.append({"question": question, "answer": student_answer})
-        full_session_log += f"Q{i}: {question}\nA: {student_answer}\n"
+    if pending_answer:
+        full_session_log += record_answer(*pending_answer)
 
     # Step 5: Final Evaluation with detailed feedback for missing/wrong answers
-    eval_prompt = [
-        {"role": "system", "content": (
-            "You are a friendly and constructive interviewer. "
-            "For each question and answer pair, do the following:\n"
-            "- If the student gave no answer or 'No answer provided', politely say "
-            "'The question was not answered. Here is the correct answer:' and provide a medium-length correct answer.\n"
-            "- If the student's answer is incorrect or incomplete, politely say "
-            "'Your answer needs improvement. The correct answer is:' followed by the correct answer.\n"
-            "- If the answer is correct or good, give positive feedback.\n"
-            "Make the overall summary kind, helpful, and encouraging."
-        )},
-        {"role": "user", "content": str(student_answers)}
-    ]
-    final_feedback = chat_completion(eval_prompt)
+    for answer_record, evaluation in zip(student_answers, evaluations):
+        try:
+            answer_record["evaluation"] = evaluation.result()
+        except Exception as e:
+            # finalize_evaluation grades it again
+            print(f"❌ Evaluation failed for question {answer_record['question_number']}: {e}")
+    final_feedback = service.finalize_evaluation(student_answers)
 
     # Step 6: Summary
     summary_text = f"Interview completed. Here is your feedback: {final_feedback}"
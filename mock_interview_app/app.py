@@ -1,56 +1,154 @@
-from flask import Flask, render_template, request, redirect, url_for, session
-import requests
+import html
+import json
+import os
+import uuid
 
-app = Flask(__name__)
-app.secret_key = "supersecret"   # needed for sessions
-API_BASE = "http://127.0.0.1:8000"   # FastAPI backend
+import httpx
+from fastapi import FastAPI, Form, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
 
-@app.route("/")
-def index():
-    return render_template("index.html")
+from app.services.session_store import create_session_store
 
-@app.route("/settings")
-def settings():
-    return render_template("settings.html")
+HERE = os.path.dirname(os.path.abspath(__file__))
+API_BASE = os.getenv("API_BASE", "http://127.0.0.1:8000")   # FastAPI backend (api_main.py)
+SESSION_COOKIE = "interview_id"
 
-@app.route("/questions", methods=["POST"])
-def questions():
-    topic = request.form["topic"]
-    difficulty = request.form["difficulty"]
-    num_questions = int(request.form["num_questions"])
+app = FastAPI(title="Mock Interview App")
+app.mount("/static", StaticFiles(directory=os.path.join(HERE, "static")), name="static")
+templates = Jinja2Templates(directory=os.path.join(HERE, "templates"))
 
-    res = requests.post(f"{API_BASE}/generate_questions", json={
+
+# Interview state lives server-side; the cookie only carries its ID. Use sqlite
+# or redis when several frontend workers must see the same interviews.
+interviews = create_session_store("FRONTEND_SESSION_", db_path="frontend_sessions.db",
+                                  redis_prefix="mock-interview:frontend:")
+
+
+@app.on_event("startup")
+async def open_api_client():
+    # One pooled client per worker: keep-alive connections to the API are reused
+    # across candidates, and no call can hang a page forever
+    app.state.api = httpx.AsyncClient(
+        base_url=API_BASE,
+        timeout=httpx.Timeout(float(os.getenv("API_TIMEOUT", "120")), connect=5.0),
+        limits=httpx.Limits(max_connections=int(os.getenv("API_MAX_CONNECTIONS", "100")),
+                            max_keepalive_connections=int(os.getenv("API_MAX_KEEPALIVE", "20")))
+    )
+
+
+@app.on_event("shutdown")
+async def close_api_client():
+    await app.state.api.aclose()
+    await interviews.close()
+
+
+@app.exception_handler(httpx.HTTPError)
+async def api_unavailable(request: Request, exc: httpx.HTTPError):
+    # httpx messages include the request URL, so they are escaped before going into the page
+    return HTMLResponse(f"<h2>The interview service is unavailable</h2><p>{html.escape(str(exc))}</p>",
+                        status_code=502)
+
+
+async def current_interview(request: Request):
+    interview_id = request.cookies.get(SESSION_COOKIE)
+    interview = await interviews.get(interview_id) if interview_id else None
+    return interview_id, interview
+
+
+@app.get("/", response_class=HTMLResponse)
+async def index(request: Request):
+    return templates.TemplateResponse("index.html", {"request": request})
+
+
+@app.get("/settings", response_class=HTMLResponse)
+async def settings(request: Request):
+    return templates.TemplateResponse("settings.html", {"request": request})
+
+
+@app.post("/questions", response_class=HTMLResponse)
+async def questions(request: Request, topic: str = Form(...), difficulty: str = Form(...),
+                    num_questions: int = Form(...)):
+    res = await app.state.api.post("/generate_questions", json={
         "topic": topic,
         "difficulty": difficulty,
         "num_questions": num_questions
     })
+    res.raise_for_status()
 
+    interview_id = uuid.uuid4().hex
     questions = res.json()["questions"]
-    session["questions"] = questions
-    session["answers"] = []
+    await interviews.save(interview_id, {
+        "topic": topic, "difficulty": difficulty, "questions": questions, "answers": [], "status": "active"
+    })
 
-    return render_template("questions.html", questions=questions, q_index=0)
+    response = templates.TemplateResponse("questions.html", {"request": request, "questions": questions, "q_index": 0})
+    response.set_cookie(SESSION_COOKIE, interview_id, httponly=True, samesite="lax")
+    return response
 
-@app.route("/submit_answer", methods=["POST"])
-def submit_answer():
-    q_index = int(request.form["q_index"])
-    answer = request.form["answer"]
 
-    # save answer in session
-    answers = session.get("answers", [])
-    answers.append({
-        "question": session["questions"][q_index],
-        "answer": answer
-    })
-    session["answers"] = answers
+@app.post("/submit_answer", response_class=HTMLResponse)
+async def submit_answer(request: Request, q_index: int = Form(...), answer: str = Form(...)):
+    interview_id, interview = await current_interview(request)
+    if interview is None:
+        return RedirectResponse(request.url_for("settings"), status_code=303)
+
+    # Indexing by q_index keeps a resubmitted form from adding the answer twice
+    questions = interview["questions"]
+    interview["answers"] = interview["answers"][:q_index] + [{"question": questions[q_index], "answer": answer}]
 
     # check if more questions left
-    if q_index + 1 < len(session["questions"]):
-        return render_template("questions.html", questions=session["questions"], q_index=q_index+1)
-    else:
-        res = requests.post(f"{API_BASE}/evaluate", json={"qa_pairs": session["answers"]})
-        feedback = res.json()["feedback"]
-        return render_template("results.html", feedback=feedback)
+    if q_index + 1 < len(questions):
+        await interviews.save(interview_id, interview)
+        return templates.TemplateResponse("questions.html",
+                                          {"request": request, "questions": questions, "q_index": q_index + 1})
+
+    # The page renders at once and fills in feedback from /results/stream as it is written
+    interview["status"] = "completed"
+    await interviews.save(interview_id, interview)
+    return templates.TemplateResponse("results.html", {"request": request, "answers": interview["answers"]})
+
+
+@app.get("/results/stream")
+async def results_stream(request: Request):
+    """Relay the API's feedback stream as Server-Sent Events and keep the final text"""
+    interview_id, interview = await current_interview(request)
+
+    async def events():
+        if interview is None:
+            yield f"event: error\ndata: {json.dumps({'detail': 'Interview not found'})}\n\n"
+            return
+        if interview.get("feedback"):
+            yield f"event: done\ndata: {json.dumps({'feedback': interview['feedback']})}\n\n"
+            return
+        try:
+            async with app.state.api.stream("POST", "/evaluate/stream",
+                                            json={"qa_pairs": interview["answers"]}) as res:
+                if res.status_code != 200:
+                    yield f"event: error\ndata: {json.dumps({'detail': f'API returned {res.status_code}'})}\n\n"
+                    return
+                event = None
+                async for line in res.aiter_lines():
+                    if line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                    elif line.startswith("data:") and event == "done":
+                        interview["feedback"] = json.loads(line[len("data:"):])["feedback"]
+                        await interviews.save(interview_id, interview)
+                    elif not line:
+                        event = None
+                    yield line + "\n"
+        except httpx.HTTPError as e:
+            yield f"event: error\ndata: {json.dumps({'detail': f'The interview service is unavailable: {e}'})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+    import uvicorn
+
+    # Each worker is one event loop serving many candidates concurrently
+    # Run from the repository root (python -m mock_interview_app.app) so `app` is importable
+    uvicorn.run("mock_interview_app.app:app", host="127.0.0.1", port=5000,
+                workers=int(os.getenv("FRONTEND_WORKERS", "1")))
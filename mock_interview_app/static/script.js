@@ -0,0 +1,24 @@
+// Fill `target` with feedback as the server streams it (token messages, then a 'done' event)
+function streamFeedback(url, target) {
+  const source = new EventSource(url);
+  let started = false;
+
+  source.onmessage = (event) => {
+    if (!started) {
+      target.textContent = "";
+      started = true;
+    }
+    target.textContent += JSON.parse(event.data).token;
+  };
+  source.addEventListener("done", (event) => {
+    target.textContent = JSON.parse(event.data).feedback;
+    source.close();
+  });
+  source.addEventListener("error", (event) => {
+    // Closing stops the browser from reconnecting and grading again
+    source.close();
+    if (event.data) {
+      target.textContent += "\n" + JSON.parse(event.data).detail;
+    }
+  });
+}